@@ -0,0 +1,26 @@
+from lcd240128 import LCD240128, Gauge, GAUGE_FACE
+from time import sleep_ms
+
+lcd = LCD240128( wr = 14, rd = 13, ce = 12, cd = 11, rst = 10, fs = 1,
+                db0 = 9, db1 = 8, db2 = 7, db3 = 6, db4 = 5, db5 = 4, db6 = 3, db7 = 2,
+                rotation = 0 )
+
+lcd.fill(0) # clear
+
+# 270 degree gauge, needle inverted over the face
+speed = Gauge( 60, 64, 56, 0, 200 )
+# 360 degree dial, needle erased from the saved face
+heading = Gauge( 180, 64, 50, 0, 360, 0, 360, 8, GAUGE_FACE )
+
+lcd.text( "km/h", 44, 90 )
+lcd.draw_gauge( speed )
+lcd.draw_gauge( heading )
+lcd.show()
+
+value = 0
+while True:
+    value = ( value + 3 ) % 360
+    lcd.set_needle( speed, value * 200 // 360 )
+    lcd.set_needle( heading, value )
+    lcd.show_dirty() # only the needle areas
+    sleep_ms( 20 )
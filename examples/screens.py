@@ -0,0 +1,56 @@
+from lcd240128 import LCD240128, ScreenManager
+from time import sleep_ms
+
+lcd = LCD240128( wr = 14, rd = 13, ce = 12, cd = 11, rst = 10, fs = 1,
+                db0 = 9, db1 = 8, db2 = 7, db3 = 6, db4 = 5, db5 = 4, db6 = 3, db7 = 2,
+                rotation = 0 )
+
+ticks = 0
+samples = []
+
+def draw_counter( lcd ):
+    lcd.fill_rect( 8, 40, 120, 8, 0 )
+    lcd.text( "Ticks: " + str( ticks ), 8, 40 )
+    lcd.mark_dirty( 8, 40, 120, 8 )
+
+def render_status( lcd ):
+    lcd.rect( 0, 0, 240, 128, 1 )
+    lcd.text( "STATUS", 8, 8 )
+    draw_counter( lcd )
+
+def draw_sample( lcd ):
+    x = 8 + len( samples ) - 1
+    lcd.pixel( x, 120 - samples[-1], 1 )
+    lcd.mark_dirty( x, 120 - samples[-1], 1, 1 )
+
+def render_trend( lcd ):
+    lcd.rect( 0, 0, 240, 128, 1 )
+    lcd.text( "TREND", 8, 8 )
+    for x, y in enumerate( samples ):
+        lcd.pixel( 8 + x, 120 - y, 1 )
+
+def render_settings( lcd ):
+    lcd.rect( 0, 0, 240, 128, 1 )
+    lcd.text( "SETTINGS", 8, 8 )
+    lcd.text( "Contrast: 5", 8, 40 )
+    lcd.text( "Backlight: on", 8, 56 )
+
+# Two screens in RAM at most: the third one is rendered again when shown
+screens = ScreenManager( lcd, limit = 2 )
+screens.add( "status", render_status )
+screens.add( "trend", render_trend )
+screens.add( "settings", render_settings )
+
+order = ( "status", "trend", "status", "settings" )
+for step in range( 200 ):
+    if step % 50 == 0:
+        screens.show( order[step // 50 % len( order )] ) # one transfer
+
+    ticks += 1
+    # Screens in the background keep their buffers up to date
+    screens.draw( "status", draw_counter )
+    if len( samples ) < 224:
+        samples.append( ticks * 7 % 80 )
+        screens.draw( "trend", draw_sample )
+    lcd.show_dirty() # changes of the active screen only
+    sleep_ms( 40 )
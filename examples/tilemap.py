@@ -0,0 +1,23 @@
+from lcd240128 import LCD240128, TileMap
+from time import sleep
+import icons
+
+lcd = LCD240128( wr = 14, rd = 13, ce = 12, cd = 11, rst = 10, fs = 1,
+                db0 = 9, db1 = 8, db2 = 7, db3 = 6, db4 = 5, db5 = 4, db6 = 3, db7 = 2,
+                rotation = 0 )
+
+lcd.fill(0) # clear
+
+# 15 x 8 grid of 16x16 icons from the atlas for_examples/icons.py
+grid = TileMap( icons, 15, 8 )
+weather = [icons.SUN, icons.SUNCLOUD, icons.RAIN, icons.RAINLIGHT, icons.SNOWMAN]
+
+for i in range( len( weather ) ):
+    for row in range( 8 ):
+        for col in range( 15 ):
+            # Checkerboard: only half of the cells change every time
+            grid.set( col, row, weather[i] if ( col + row ) & 1 else icons.SUN )
+            
+    lcd.draw_tilemap( grid ) # one call, changed cells only
+    lcd.show_dirty()
+    sleep( 1 )
@@ -0,0 +1,27 @@
+from lcd240128_rp2 import LCD240128, Grayscale
+from machine import Timer
+from time import sleep
+
+lcd = LCD240128( wr = 14, rd = 13, ce = 12, cd = 11, rst = 10, fs = 1,
+                db0 = 9, db1 = 8, db2 = 7, db3 = 6, db4 = 5, db5 = 4, db6 = 3, db7 = 2,
+                rotation = 0 )
+
+# 3 phases = 4 levels, needs 3 pages ( 11520 bytes ) of display RAM.
+# With 8 KB of display RAM use Grayscale( lcd, 2 )
+gray = Grayscale( lcd, 3 )
+
+# Four gray bars
+for level in range( 4 ):
+    gray.fill_rect( level * 60, 0, 60, 100, level )
+    gray.text( str( level ), level * 60 + 26, 110, 3 )
+    
+gray.start( Timer(), 150 ) # uploads the pages and cycles them
+
+sleep( 5 )
+gray.rect( 20, 20, 200, 60, 3, True ) # changes are uploaded by update()
+gray.ellipse( 120, 50, 50, 20, 1, True )
+gray.update()
+
+sleep( 5 )
+gray.stop()
+lcd.show()
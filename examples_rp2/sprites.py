@@ -0,0 +1,35 @@
+from lcd240128_rp2 import LCD240128, SpriteLayer
+from bitmaps import sun, cloud
+
+lcd = LCD240128( wr = 14, rd = 13, ce = 12, cd = 11, rst = 10, fs = 1,
+                db0 = 9, db1 = 8, db2 = 7, db3 = 6, db4 = 5, db5 = 4, db6 = 3, db7 = 2,
+                rotation = 0 )
+
+lcd.fill(0) # clear
+lcd.load_bmp("tree240x128.bmp", 0, 0) # background artwork
+lcd.show()
+
+layer = SpriteLayer( lcd )
+# Sprite data, position, speed
+objects = [
+    [ layer.add( lcd.make_sprite( sun ), 0, 0, z = 1 ), 0, 0, 3, 2 ],
+    [ layer.add( lcd.make_sprite( cloud ), 100, 60 ), 100, 60, -2, 1 ],
+]
+
+while True:
+    for obj in objects:
+        item, x, y, x_speed, y_speed = obj
+        height, width = item[0][2], item[0][3]
+        
+        x += x_speed
+        y += y_speed
+        if x + width > lcd.width or x < 0:
+            x_speed = -x_speed
+        if y + height > lcd.height or y < 0:
+            y_speed = -y_speed
+            
+        layer.move( item, x, y )
+        obj[1:] = [ x, y, x_speed, y_speed ]
+        
+    layer.update()  # backgrounds back, sprites drawn, changes marked dirty
+    lcd.show_dirty() # send only the changed bytes
@@ -0,0 +1,77 @@
+# Code generated by bitmap_atlas.py.
+# Cmd: bitmap_atlas.py ../for_examples/bitmaps.py ../for_examples/icons.py
+from micropython import const
+from struct import unpack_from
+
+SUN = const(0)
+CLOUD = const(1)
+RAIN = const(2)
+RAINLIGHT = const(3)
+SUNCLOUD = const(4)
+WINDOW = const(5)
+FONTAIN = const(6)
+SNOWMAN = const(7)
+TERMOMETER = const(8)
+UMBRELLA = const(9)
+DROP = const(10)
+DOOR = const(11)
+LAMP = const(12)
+ALERT = const(13)
+FAN = const(14)
+THUMBUP = const(15)
+RFINGER = const(16)
+
+names = ('sun', 'cloud', 'rain', 'rainlight', 'suncloud', 'window', 'fontain', 'snowman', 'termometer', 'umbrella', 'drop', 'door', 'lamp', 'alert', 'fan', 'thumbup', 'rfinger',)
+
+index =\
+b'\x00\x00\x00\x00\x10\x00\x10\x00\x20\x00\x00\x00\x10\x00\x10\x00'\
+b'\x40\x00\x00\x00\x10\x00\x10\x00\x60\x00\x00\x00\x10\x00\x10\x00'\
+b'\x80\x00\x00\x00\x10\x00\x10\x00\xa0\x00\x00\x00\x10\x00\x10\x00'\
+b'\xc0\x00\x00\x00\x10\x00\x10\x00\xe0\x00\x00\x00\x10\x00\x10\x00'\
+b'\x00\x01\x00\x00\x10\x00\x10\x00\x20\x01\x00\x00\x10\x00\x10\x00'\
+b'\x40\x01\x00\x00\x10\x00\x10\x00\x60\x01\x00\x00\x10\x00\x10\x00'\
+b'\x80\x01\x00\x00\x10\x00\x10\x00\xa0\x01\x00\x00\x10\x00\x10\x00'\
+b'\xc0\x01\x00\x00\x10\x00\x10\x00\xe0\x01\x00\x00\x10\x00\x10\x00'\
+b'\x00\x02\x00\x00\x10\x00\x10\x00'
+
+data =\
+b'\x00\x00\x00\x80\x20\x84\x18\x88\x0c\x18\x03\xc0\x07\xe0\x77\xec'\
+b'\x37\xee\x07\xe0\x03\xc0\x0c\x18\x18\x08\x20\x84\x00\x80\x00\x00'\
+b'\x00\x00\x01\xc0\x03\xf8\x07\xfc\x1f\xfc\x3f\xfe\x7f\xff\x7f\xff'\
+b'\x3f\xfe\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00'\
+b'\x00\x00\x01\xc0\x03\xf8\x07\xfc\x1f\xfc\x3f\xfe\x7f\xff\x7f\xff'\
+b'\x3f\xfe\x00\x00\x12\x48\x00\x00\x24\x90\x00\x00\x49\x20\x00\x00'\
+b'\x00\x00\x01\xc0\x03\xf8\x07\xfc\x1f\xdc\x3f\x9e\x7f\x3f\x7f\x6f'\
+b'\x3e\xce\x02\x10\x11\x94\x00\xa0\x25\x28\x01\x40\x48\x90\x00\x00'\
+b'\x00\x00\x04\x00\x44\x40\x20\x80\x0e\x00\x1f\x70\xde\x78\x18\xfe'\
+b'\x07\xff\x3f\xff\x5f\xff\x0f\xfe\x07\xfc\x00\x00\x00\x00\x00\x00'\
+b'\x00\x00\x7f\xfc\x45\x04\x4d\x04\x49\x04\x59\x04\x59\x04\x5f\xfc'\
+b'\x49\x04\x4d\x04\x45\x04\x45\x04\x45\x04\x47\xfc\x7c\x00\x00\x00'\
+b'\x00\x00\x0f\x78\x11\x84\x2e\xba\x2a\xaa\x2a\xaa\x22\xa2\x02\xa0'\
+b'\x00\x00\x07\xf0\x03\xe0\x00\x00\x0f\xf8\x07\xf0\x03\xe0\x00\x00'\
+b'\x01\x00\x07\x80\x02\xc0\x03\xe0\x04\x20\x05\x40\x04\x20\x02\x40'\
+b'\x44\x10\x38\x0e\x40\x89\x08\x08\x08\x88\x04\x10\x03\xc0\x00\x00'\
+b'\x00\x00\x03\x80\x04\x40\x04\x40\x04\x58\x05\x40\x05\x58\x05\x40'\
+b'\x05\x58\x05\x40\x09\x20\x0b\xa0\x09\x20\x04\x40\x03\x80\x00\x00'\
+b'\x01\xc0\x07\xf0\x0f\xf8\x1f\xfc\x34\x96\x00\x80\x00\x80\x00\x80'\
+b'\x00\x80\x00\x80\x00\x80\x08\x80\x03\x00\x00\x00\x00\x00\x00\x00'\
+b'\x00\x00\x00\x80\x01\xc0\x03\xe0\x07\xf0\x0f\xf8\x0f\xf8\x1f\xfc'\
+b'\x1f\xfc\x1f\xfc\x19\xfc\x19\xfc\x0d\xf8\x07\xf0\x03\xe0\x00\x00'\
+b'\x00\x00\x0f\xf0\x0f\x10\x0f\x90\x0f\x90\x0f\x90\x0f\x90\x0f\x90'\
+b'\x0e\x90\x0e\x90\x0f\x90\x0f\x90\x0f\x90\x0f\xf0\x03\x80\x00\x00'\
+b'\x00\x00\x07\xc0\x0c\x60\x18\x30\x10\x10\x16\xd0\x12\x90\x1a\x90'\
+b'\x09\x20\x0d\x60\x07\xc0\x07\xc0\x00\x00\x07\xc0\x03\x80\x00\x00'\
+b'\x00\x00\x00\x80\x01\x40\x03\x40\x02\x20\x04\xa0\x05\x90\x09\x98'\
+b'\x09\x88\x10\x0c\x31\x84\x21\x82\x60\x02\x3f\xfe\x00\x00\x00\x00'\
+b'\x07\xe0\x18\xf8\x21\x34\x41\x12\x41\x0a\x9d\x09\xa2\x11\xc1\xa1'\
+b'\xc1\x81\xc4\x39\xa9\x05\x51\x06\x41\x0a\x20\xfc\x18\x18\x07\xe0'\
+b'\x00\xe0\x01\xf0\x01\xb0\x01\xb0\x03\x20\x07\x60\xfe\x7e\xfc\x7f'\
+b'\xcc\x07\xcc\x06\xcc\x06\xcc\x06\xcc\x0e\xcc\x0c\xef\xfc\x7f\xf8'\
+b'\x00\x00\x00\x00\x03\x80\x0c\x80\x19\x80\x61\xff\x80\x01\x80\x7e'\
+b'\x80\x08\x80\xf0\x80\x10\x80\xf0\xf0\x20\x0f\xc0\x00\x00\x00\x00'
+
+
+def get(icon):
+    # Bitmap tuple ( data, height, width ) for draw_bitmap
+    offset, width, height = unpack_from('<IHH', index, icon * 8)
+    return memoryview(data)[offset:offset + ((width + 7) // 8) * height], height, width
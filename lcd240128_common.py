@@ -0,0 +1,681 @@
+"""
+Driver independent classes of the LCD240128 drivers ( lcd240128.py and lcd240128_rp2.py ):
+Atlas, ImageCache, SpriteLayer, TileMap, Gauge, Cursor, Grayscale, LCDBus and
+ScreenManager. Both drivers import them, use them through the driver module:
+    from lcd240128 import LCD240128, Gauge
+"""
+from framebuf import FrameBuffer, MONO_HLSB, MONO_HMSB
+from time import ticks_ms, ticks_diff
+from array import array
+from struct import unpack_from
+from os import stat
+from math import sin, pi
+
+LCD_WIDTH   = const(240)
+LCD_HEIGHT  = const(128)
+LCD_BUFFSIZE = const( LCD_WIDTH * LCD_HEIGHT // 8 )
+LCD_COLUMNS = const( LCD_WIDTH // 8 )
+
+BUS_CHUNK   = const(240) # LCDBus: bytes sent to a display in one turn
+
+GAUGE_XOR  = const(0) # Gauge: the old needle is erased by drawing it again in XOR
+GAUGE_FACE = const(1) # Gauge: the old needle is erased from the saved dial face
+TRIG_SHIFT = const(12) # Gauge: fixed-point sine table, 1.0 = 1 << TRIG_SHIFT
+
+# Empty dirty area: first and last + 1 dirty byte column of every row
+_NO_DIRTY = bytes( [LCD_COLUMNS, 0] * LCD_HEIGHT )
+
+def _sine_table():
+    ''' Fixed-point sine of 0..90 degrees, computed once at import '''
+    return array( 'h', [int( sin( i * pi / 180 ) * ( 1 << TRIG_SHIFT ) + 0.5 ) for i in range( 91 )] )
+
+_SIN90 = _sine_table()
+
+def _sin( angle ):
+    ''' Fixed-point sine of an angle in whole degrees '''
+    angle %= 360
+    if angle <= 90:
+        return _SIN90[angle]
+    if angle <= 180:
+        return _SIN90[180 - angle]
+    if angle <= 270:
+        return -_SIN90[angle - 180]
+    return -_SIN90[360 - angle]
+
+class Atlas:
+    """ Icon atlas loaded from a binary file made by tools/bitmap_atlas.py
+    Args
+    filename (string): filename of atlas, example: "icons.bin"
+    """
+    def __init__( self, filename ):
+        f = open(filename, 'rb')
+        if f.read(2) != b'AT':
+            f.close()
+            raise ValueError("Not an atlas file")
+        
+        count = int.from_bytes(f.read(2), 'little')
+        self.index = f.read(count * 8)
+        size = int.from_bytes(f.read(2), 'little')
+        self.names = f.read(size).decode().split('\n')
+        self.data = f.read()
+        f.close()
+
+class ImageCache:
+    """ Decoded images kept in RAM for draw_image, the least recently used
+    images are dropped to stay within the byte budget
+    Args
+    budget (int): Bytes of decoded images to keep
+    """
+    def __init__( self, budget ):
+        self.budget = budget
+        self.used = 0
+        self._images = {} # filename: ( signature, mode, bitmap )
+        self._order = []  # filenames, least recently used first
+        
+    def get( self, filename, mode = None ):
+        """ Cached bitmap ( data, height, width ), None if missing, the file has
+        changed or it was decoded with another mode ( dither of draw_image ) """
+        entry = self._images.get( filename )
+        if entry is None:
+            return None
+        if entry[0] != self._signature( filename ) or entry[1] != mode:
+            self.remove( filename )
+            return None
+        self._order.remove( filename )
+        self._order.append( filename )
+        return entry[2]
+    
+    def put( self, filename, bitmap, mode = None ):
+        """ Keep a decoded bitmap, images larger than the budget are not kept """
+        self.remove( filename )
+        size = len( bitmap[0] )
+        if size > self.budget:
+            return
+        while self.used + size > self.budget:
+            self.remove( self._order[0] )
+        self._images[filename] = ( self._signature( filename ), mode, bitmap )
+        self._order.append( filename )
+        self.used += size
+        
+    def remove( self, filename ):
+        entry = self._images.pop( filename, None )
+        if entry:
+            self._order.remove( filename )
+            self.used -= len( entry[2][0] )
+            
+    def clear( self ):
+        self._images = {}
+        self._order = []
+        self.used = 0
+        
+    def _signature( self, filename ):
+        info = stat( filename )
+        return ( info[6], info[8] ) # size, modification time
+
+class SpriteLayer:
+    """ Sprites moving over the framebuffer content: the background under
+    every sprite is saved when it is drawn and put back before it moves.
+    Moved sprites mark their old and new areas dirty for show_dirty.
+    Draw the background between hide() and update() once sprites are shown.
+    Args
+    lcd (LCD240128): Display
+    """
+    def __init__( self, lcd ):
+        self.lcd = lcd
+        self._sprites = [] # [ sprite, x, y, z, color, saved, drawn, changed ] in z order
+        self._removed = []
+        self._shown = False
+        
+    def add( self, sprite, x, y, z = 0, color = 1 ):
+        """ Add a sprite, drawn at the next update
+        Args
+        sprite (tuple): Bitmap data, mask data, height, width (see make_sprite)
+        x      (int): Start X position
+        y      (int): Start Y position
+        z      (int): Sprites with higher z are drawn on top
+        color  (int): Color of the bitmap pixels 0 or 1
+        Return (list): Handle of the sprite
+        """
+        item = [sprite, x, y, z, color, None, None, True]
+        i = len( self._sprites )
+        while i and self._sprites[i - 1][3] > z:
+            i -= 1
+        self._sprites.insert( i, item )
+        return item
+    
+    def move( self, item, x, y ):
+        """ Move a sprite, drawn at the next update """
+        if item[1] != x or item[2] != y:
+            item[1] = x
+            item[2] = y
+            item[7] = True
+            
+    def remove( self, item ):
+        """ Remove a sprite, its background is back at the next update """
+        self._removed.append( item )
+        
+    def hide( self ):
+        """ Put the saved backgrounds back, top sprite first """
+        if not self._shown:
+            return
+        for item in reversed( self._sprites ):
+            self._restore( item )
+        self._shown = False
+        
+    def update( self ):
+        """ Draw the sprites at their position, moved ones mark their old and new area dirty """
+        lcd = self.lcd
+        self.hide()
+        for item in self._removed:
+            if item[6]:
+                lcd.mark_dirty( *item[6] )
+            self._sprites.remove( item )
+        self._removed = []
+        
+        for item in self._sprites:
+            data, mask, height, width = item[0]
+            x, y = item[1], item[2]
+            if item[7]:
+                if item[6]:
+                    lcd.mark_dirty( *item[6] )
+                lcd.mark_dirty( x, y, width, height )
+                item[6] = ( x, y, width, height )
+                item[7] = False
+            self._save( item )
+            lcd._blit_masked( data, mask, width, height, x, y, item[4] )
+        self._shown = True
+        
+    def _save( self, item ):
+        """ Copy the framebuffer bytes under a sprite """
+        height, width = item[0][2], item[0][3]
+        x, y = item[1], item[2]
+        col0 = max( x, 0 ) >> 3
+        col1 = ( min( x + width, LCD_WIDTH ) + 7 ) >> 3
+        row0 = max( y, 0 )
+        row1 = min( y + height, LCD_HEIGHT )
+        if col0 >= col1 or row0 >= row1:
+            item[5] = None
+            return
+        
+        count = col1 - col0
+        size = count * ( row1 - row0 )
+        saved = item[5]
+        if saved is None or len( saved[0] ) != size:
+            data = bytearray( size )
+        else:
+            data = saved[0]
+        buffer = memoryview( self.lcd.buffer )
+        pos = 0
+        for row in range( row0, row1 ):
+            start = row * LCD_COLUMNS + col0
+            data[pos : pos + count] = buffer[start : start + count]
+            pos += count
+        item[5] = ( data, col0, row0, count )
+        
+    def _restore( self, item ):
+        """ Put the saved framebuffer bytes of a sprite back """
+        saved = item[5]
+        if saved is None:
+            return
+        data, col0, row0, count = saved
+        buffer = memoryview( self.lcd.buffer )
+        pos = 0
+        for row in range( row0, row0 + len( data ) // count ):
+            start = row * LCD_COLUMNS + col0
+            buffer[start : start + count] = data[pos : pos + count]
+            pos += count
+
+class TileMap:
+    """ Grid of tiles from an atlas made by tools/bitmap_atlas.py, drawn with
+    draw_tilemap: only the cells changed since the last draw are rendered
+    Args
+    atlas (module): Atlas module or Atlas object, tiles of one size, width multiple of 8
+    cols (int): Grid width in tiles
+    rows (int): Grid height in tiles
+    x (int) : Start X position, multiple of 8
+    y (int) : Start Y position
+    """
+    def __init__( self, atlas, cols, rows, x = 0, y = 0 ):
+        offset, width, height = unpack_from( '<IHH', atlas.index, 0 )
+        if width & 7 or x & 7:
+            raise ValueError("Tile width and x must be multiples of 8")
+        
+        self.atlas = atlas
+        self.tile_width = width
+        self.tile_height = height
+        self.cols = cols
+        self.rows = rows
+        self.x = x
+        self.y = y
+        self.cells = bytearray( cols * rows ) # tile id of every cell
+        self._drawn = bytearray( b'\xff' * ( cols * rows ) ) # tile ids on screen, 0xFF: draw again
+        
+    def set( self, col, row, tile ):
+        """ Set the tile of a cell, tile ids 0..254 """
+        self.cells[row * self.cols + col] = tile
+        
+    def invalidate( self ):
+        """ Draw every cell again at the next draw_tilemap """
+        for i in range( len( self._drawn ) ):
+            self._drawn[i] = 0xFF
+
+class Gauge:
+    """ Needle gauge or dial, drawn with draw_gauge and moved with set_needle.
+    Angles are whole degrees clockwise from 12 o'clock, looked up in a
+    fixed-point sine table: needle updates need no float maths.
+    In GAUGE_XOR mode the needle is inverted over the face, in GAUGE_FACE
+    mode the face is saved and the old needle area is copied back from it.
+    Call draw_gauge again after drawing over the gauge: it first removes the
+    needle already drawn, then draws the face and the needle again.
+    Args
+    cx (int): X position of the needle axis
+    cy (int): Y position of the needle axis
+    radius (int): Radius of the scale
+    low (number): Value at the scale start
+    high (number): Value at the scale end
+    start (int): Angle of the scale start, example: -135
+    sweep (int): Angle from the scale start to its end, 360 for a dial
+    ticks (int): Number of scale divisions, 0: no ticks
+    mode (int): GAUGE_XOR or GAUGE_FACE
+    color (int): Color 0 or 1
+    """
+    def __init__( self, cx, cy, radius, low = 0, high = 100, start = -135, sweep = 270, ticks = 10, mode = GAUGE_XOR, color = 1 ):
+        self.cx = cx
+        self.cy = cy
+        self.radius = radius
+        self.low = low
+        self.high = high
+        self.start = start
+        self.sweep = sweep
+        self.ticks = ticks
+        self.mode = mode
+        self.color = color
+        self.tick = max( radius >> 3, 2 ) # tick length
+        self.hub = max( radius >> 4, 2 )  # radius of the needle axis
+        self.value = low
+        self.box = None     # needle area on screen ( x, y, w, h )
+        self._angle = None  # needle angle on screen
+        self._ends = None   # needle line on screen ( x0, y0, x1, y1 )
+        self._face = None   # GAUGE_FACE: saved face ( data, col0, row0, count )
+        
+    def angle( self, value ):
+        """ Needle angle of a value, in degrees """
+        value = min( max( value, self.low ), self.high )
+        return self.start + int( ( value - self.low ) * self.sweep // ( self.high - self.low ) )
+    
+    def point( self, angle, distance ):
+        """ Screen position at an angle and a distance from the needle axis
+        Return (tuple): x, y
+        """
+        half = 1 << ( TRIG_SHIFT - 1 )
+        x = self.cx + ( ( _sin( angle ) * distance + half ) >> TRIG_SHIFT )
+        y = self.cy - ( ( _sin( angle + 90 ) * distance + half ) >> TRIG_SHIFT )
+        return x, y
+
+class Cursor:
+    """ Text cursor or selection box drawn in XOR over the FrameBuffer:
+    inverting it again restores what is under it, so showing, hiding and
+    moving it need no redraw and no saved background. Every change marks
+    its area dirty for show_dirty. Hide it before drawing under it.
+    Args
+    lcd (LCD240128): Display
+    x (int): Start X position
+    y (int): Start Y position
+    w (int): Width
+    h (int): Height
+    f (bool): Filled: block or bar cursor, else a box outline
+    """
+    def __init__( self, lcd, x, y, w = 1, h = 8, f = True ):
+        self.lcd = lcd
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.f = f
+        self.visible = False
+        self._blink = ticks_ms()
+        
+    def toggle( self ):
+        """ Invert the cursor area: show a hidden cursor, hide a shown one """
+        self.lcd.xor_rect( self.x, self.y, self.w, self.h, self.f )
+        self.visible = not self.visible
+        
+    def show( self ):
+        if not self.visible:
+            self.toggle()
+            
+    def hide( self ):
+        if self.visible:
+            self.toggle()
+            
+    def move( self, x, y, w = None, h = None ):
+        """ Move or resize the cursor ( rubber band ), a shown cursor stays shown """
+        visible = self.visible
+        self.hide()
+        self.x = x
+        self.y = y
+        if w is not None:
+            self.w = w
+        if h is not None:
+            self.h = h
+        if visible:
+            self.toggle()
+            
+    def blink( self, period = 500 ):
+        """ Toggle the cursor every period ms, call it from the main loop
+        Return (bool): True if the cursor was toggled
+        """
+        now = ticks_ms()
+        if ticks_diff( now, self._blink ) < period:
+            return False
+        self._blink = now
+        self.toggle()
+        return True
+
+class Grayscale:
+    """ Gray levels by temporal dithering: the picture is kept as two bit
+    planes ( 2 bits per pixel, levels 0 white .. 3 black ), turned into one
+    1-bit frame per phase and uploaded to its own graphic page of display
+    RAM. A timer then cycles the graphic home address through the pages,
+    the CPU only uploads again when the gray picture changes.
+    3 phases show 4 levels and need 3 pages ( 11520 bytes of display RAM ),
+    2 phases fit in 8 KB and show levels 0, 1 and 2 ( 3 is the same as 2 ).
+    Don't send the mono FrameBuffer to the display while the timer runs.
+    Args
+    lcd (LCD240128): Display
+    phases (int): 2 or 3
+    base (int): Display RAM address of the first page
+    """
+    def __init__( self, lcd, phases = 3, base = 0 ):
+        self.lcd = lcd
+        self.phases = phases
+        self.pages = [base + i * LCD_BUFFSIZE for i in range( phases )]
+        fmt = MONO_HMSB if lcd._rotation == 1 else MONO_HLSB
+        self._high_buf = bytearray( LCD_BUFFSIZE )
+        self._low_buf  = bytearray( LCD_BUFFSIZE )
+        self.high = FrameBuffer( self._high_buf, LCD_WIDTH, LCD_HEIGHT, fmt ) # bit 1 of the levels
+        self.low  = FrameBuffer( self._low_buf, LCD_WIDTH, LCD_HEIGHT, fmt )  # bit 0 of the levels
+        self._frame = bytearray( LCD_BUFFSIZE )
+        self.dirty = True
+        self._phase = 0
+        self._busy = False
+        self._timer = None
+        
+    # Drawing in gray levels 0..3 on both planes
+    
+    def fill( self, g ):
+        self.high.fill( g >> 1 )
+        self.low.fill( g & 1 )
+        self.dirty = True
+        
+    def pixel( self, x, y, g ):
+        self.high.pixel( x, y, g >> 1 )
+        self.low.pixel( x, y, g & 1 )
+        self.dirty = True
+        
+    def fill_rect( self, x, y, w, h, g ):
+        self.high.fill_rect( x, y, w, h, g >> 1 )
+        self.low.fill_rect( x, y, w, h, g & 1 )
+        self.dirty = True
+        
+    def rect( self, x, y, w, h, g, f = False ):
+        self.high.rect( x, y, w, h, g >> 1, f )
+        self.low.rect( x, y, w, h, g & 1, f )
+        self.dirty = True
+        
+    def line( self, x0, y0, x1, y1, g ):
+        self.high.line( x0, y0, x1, y1, g >> 1 )
+        self.low.line( x0, y0, x1, y1, g & 1 )
+        self.dirty = True
+        
+    def ellipse( self, x, y, xr, yr, g, f = False ):
+        self.high.ellipse( x, y, xr, yr, g >> 1, f )
+        self.low.ellipse( x, y, xr, yr, g & 1, f )
+        self.dirty = True
+        
+    def text( self, s, x, y, g = 3 ):
+        self.high.text( s, x, y, g >> 1 )
+        self.low.text( s, x, y, g & 1 )
+        self.dirty = True
+        
+    def update( self ):
+        """ Upload the phase pages if the gray picture has changed
+        Return (bool): True if the pages were uploaded
+        """
+        if not self.dirty:
+            return False
+        lcd = self.lcd
+        buffer = lcd.buffer
+        self._busy = True
+        try:
+            # Every phase frame is sent from the scratch frame to its own page
+            lcd.buffer = self._frame
+            for phase in range( self.phases ):
+                self._build( phase )
+                lcd._page = self.pages[phase]
+                lcd._send( 0, LCD_BUFFSIZE )
+        finally:
+            lcd.buffer = buffer
+            lcd._page = 0
+            self._busy = False
+        self.dirty = False
+        return True
+    
+    def start( self, timer, rate = 150 ):
+        """ Cycle the pages from a timer
+        Args
+        timer (Timer): machine.Timer, example: Timer( 0 ) on Esp32, Timer( ) on RP2
+        rate (int): Pages shown per second
+        """
+        self.update()
+        self._timer = timer
+        timer.init( freq = rate, mode = timer.PERIODIC, callback = self._next )
+        
+    def stop( self ):
+        """ Stop cycling and show the page at address 0 again, lcd.show() puts the FrameBuffer back on it """
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+        self.lcd.set_command( 0x42, 0, 0 )
+        
+    def _next( self, timer ):
+        """ Timer callback: show the next page, unless an upload is running """
+        if self._busy:
+            return
+        self._phase += 1
+        if self._phase >= self.phases:
+            self._phase = 0
+        addr = self.pages[self._phase]
+        self.lcd.set_command( 0x42, addr & 0xFF, addr >> 8 )
+        
+    @micropython.viper
+    def _build( self, phase:int ):
+        """ 1-bit frame of a phase: a level g pixel is set in g phases """
+        high = ptr8( self._high_buf )
+        low  = ptr8( self._low_buf )
+        out  = ptr8( self._frame )
+        if phase == 0: # levels 1, 2, 3
+            for i in range( LCD_BUFFSIZE ):
+                out[i] = high[i] | low[i]
+        elif phase == 1: # levels 2, 3
+            for i in range( LCD_BUFFSIZE ):
+                out[i] = high[i]
+        else: # level 3
+            for i in range( LCD_BUFFSIZE ):
+                out[i] = high[i] & low[i]
+
+class LCDBus:
+    """ Data bus shared by several displays: WR, RD, CD, RST, FS and the 8
+    data pins are wired to every display, each one has its own CE pin.
+    show() queues the FrameBuffer of a display and service() sends the
+    queue in chunks of BUS_CHUNK bytes, the displays taking turns: the
+    program draws the next screen between two calls.
+    Args
+    wr, rd, cd, rst, fs (int): Shared control pins
+    db0 .. db7 (int): Shared data bus pins
+    """
+    driver = None # display class, set by the driver module
+    
+    def __init__( self, wr, rd, cd, rst, fs, db0, db1, db2, db3, db4, db5, db6, db7 ):
+        self._pins = ( wr, rd, cd, rst, fs, db0, db1, db2, db3, db4, db5, db6, db7 )
+        self.panels = []
+        self._jobs = [] # [ display, next byte, bytes left ] in turn order
+        
+    def panel( self, ce, rotation = 0 ):
+        """ Add a display selected by its CE pin
+        Args
+        ce (int): CE pin of the display
+        rotation (int): Rotation 0 or 1
+        Return (LCD240128): The display
+        """
+        wr, rd, cd, rst, fs = self._pins[:5]
+        lcd = self.driver( wr, rd, ce, cd, rst, fs, *self._pins[5:], rotation = rotation )
+        # The shared RST has reset the other displays too
+        for other in self.panels:
+            other._reinit()
+        self.panels.append( lcd )
+        return lcd
+    
+    def show( self, lcd ):
+        """ Queue the whole FrameBuffer of a display, a display already queued
+        is sent whole again from where its transfer is
+        Args
+        lcd (LCD240128): Display of this bus
+        """
+        lcd._dirty[:] = _NO_DIRTY
+        for job in self._jobs:
+            if job[0] is lcd:
+                job[2] = LCD_BUFFSIZE
+                return
+        self._jobs.append( [lcd, 0, LCD_BUFFSIZE] )
+        
+    def service( self, budget = BUS_CHUNK * 2 ):
+        """ Send queued bytes, one chunk of every display in turn
+        Args
+        budget (int): Bytes to send at most
+        Return (int): Bytes still queued, 0: all displays are up to date
+        """
+        jobs = self._jobs
+        while jobs and budget > 0:
+            job = jobs.pop( 0 )
+            lcd, start, left = job
+            count = min( BUS_CHUNK, left, budget, LCD_BUFFSIZE - start )
+            lcd._send( start, count )
+            budget -= count
+            job[1] = ( start + count ) % LCD_BUFFSIZE
+            job[2] = left - count
+            if job[2]:
+                jobs.append( job ) # next turn
+        left = 0
+        for job in jobs:
+            left += job[2]
+        return left
+    
+    def flush( self ):
+        """ Send the whole queue """
+        while self.service( LCD_BUFFSIZE ):
+            pass
+
+class ScreenManager:
+    """ Screens kept in off-screen FrameBuffers: showing a screen makes its
+    buffer the one lcd draws to and sends, nothing is copied or drawn again,
+    switching costs one show(). Screens in the background can still be
+    updated with draw(). With a limit, the least recently shown screen is
+    dropped from RAM and rendered again the next time it is shown.
+    Args
+    lcd (LCD240128): Display
+    limit (int): Screens kept in RAM at most, 0: no limit
+    """
+    def __init__( self, lcd, limit = 0 ):
+        self.lcd = lcd
+        self.limit = limit
+        self.active = None
+        self._render = {}          # name: render( lcd ) drawing the whole screen
+        self._buffers = {}         # name: buffer of the screens in RAM
+        self._order = []           # names of the screens in RAM, least recently shown first
+        self._spare = [lcd.buffer] # free buffers, the own buffer of lcd first
+        self._dirty = bytearray( len( lcd._dirty ) )
+        
+    def add( self, name, render ):
+        """ Add a screen, rendered the first time it is shown
+        Args
+        name : Name of the screen
+        render (function): render( lcd ) draws the whole screen on a cleared FrameBuffer
+        """
+        self._render[name] = render
+        
+    def remove( self, name ):
+        """ Remove a screen and free its buffer, the active screen can't be removed """
+        if name == self.active:
+            print( "Can't remove the active screen:", name )
+            return
+        self._render.pop( name, None )
+        if name in self._buffers:
+            self._order.remove( name )
+            self._spare.append( self._buffers.pop( name ) )
+            
+    def loaded( self, name ):
+        """ Return (bool): True if the screen is in RAM """
+        return name in self._buffers
+    
+    def show( self, name ):
+        """ Make a screen active and send it, it's rendered first if not in RAM
+        Return (bool): True if the screen was rendered
+        """
+        render = self._render.get( name )
+        if render is None:
+            print( "Unknown screen:", name )
+            return False
+        
+        order = self._order
+        buffer = self._buffers.get( name )
+        fresh = buffer is None
+        if fresh:
+            if self._spare:
+                buffer = self._spare.pop()
+            elif self.limit and len( order ) >= self.limit:
+                buffer = self._buffers.pop( order.pop( 0 ) ) # reuse the least recently shown
+            else:
+                buffer = bytearray( LCD_BUFFSIZE )
+            self._buffers[name] = buffer
+        else:
+            order.remove( name )
+        order.append( name )
+        
+        lcd = self.lcd
+        lcd.set_buffer( buffer )
+        self.active = name
+        if fresh:
+            lcd.fill( 0 )
+            render( lcd )
+        lcd.show()
+        return fresh
+    
+    def draw( self, name, func ):
+        """ Update a screen, active or in the background
+        The drawing of a background screen goes to its buffer only: the
+        dirty area of lcd is kept for the active screen. A screen not in RAM
+        is skipped, its render function draws it whole when shown.
+        Args
+        name : Name of the screen
+        func (function): func( lcd ) draws on the screen
+        Return (bool): True if the screen was drawn
+        """
+        lcd = self.lcd
+        if name == self.active:
+            func( lcd )
+            return True
+        
+        buffer = self._buffers.get( name )
+        if buffer is None:
+            return False
+        
+        active = lcd.buffer
+        self._dirty[:] = lcd._dirty
+        lcd.set_buffer( buffer )
+        try:
+            func( lcd )
+        finally:
+            lcd.set_buffer( active )
+            lcd._dirty[:] = self._dirty
+        return True
@@ -36,8 +36,13 @@ I use a 1 Mega Ohm variable resistor. Acceptable contrast ~270kOm
 
 """
 from framebuf import FrameBuffer, MONO_HLSB, MONO_HMSB, MONO_VLSB
-from time import sleep_us, sleep_ms, ticks_ms, ticks_diff, ticks_cpu
+from time import sleep_us, sleep_ms, ticks_ms, ticks_diff, ticks_add, ticks_cpu
 from machine import Pin
+from array import array
+from struct import unpack_from
+# Driver independent classes, shared by both drivers and imported from here too
+from lcd240128_common import Atlas, ImageCache, SpriteLayer, TileMap, Gauge, Cursor, Grayscale, ScreenManager
+from lcd240128_common import LCDBus as _LCDBus, GAUGE_XOR, GAUGE_FACE, TRIG_SHIFT, BUS_CHUNK, _NO_DIRTY, _sin
 
 LCD_WIDTH   = const(240)
 LCD_HEIGHT  = const(128)
@@ -45,6 +50,95 @@ LCD_BUFFSIZE = const( LCD_WIDTH * LCD_HEIGHT // 8 )
 LCD_COLUMNS = const( LCD_WIDTH // 8 )
 LCD_FIX0    = const(0)
 
+BLIT_OPAQUE = const(2) # _blit_bits mode: draw background pixels too
+BLIT_LSB    = const(4) # _blit_bits mode: source bytes are LSB first
+BLIT_UP     = const(8) # _blit_columns mode: columns are drawn upwards
+RLE_WINDOW  = const(64) # load_rle: bytes of compressed data decoded at once
+ANIM_CHUNK  = const(240) # play_anim: bytes of a span applied at once
+DIRTY_GAP   = const(8) # show_dirty: dirty spans closer than this are sent together
+
+DITHER_BAYER = const(0) # load_bmp: ordered 4x4 dithering of grayscale images
+DITHER_FS    = const(1) # load_bmp: Floyd-Steinberg error diffusion
+
+FILL_OR     = const(0) # _fill_spans: pattern 1 bits are set
+FILL_OPAQUE = const(1) # _fill_spans: pattern 0 bits are cleared too
+FILL_XOR    = const(2) # _fill_spans: pixels under pattern 1 bits are inverted
+
+def _reversed_bits():
+    ''' Table of bit-reversed bytes: MONO_HLSB <-> MONO_HMSB '''
+    table = bytearray( 256 )
+    for i in range( 256 ):
+        rev = 0
+        for bit in range( 8 ):
+            rev |= ( ( i >> bit ) & 1 ) << ( 7 - bit )
+        table[i] = rev
+    return bytes( table )
+
+_REV8 = _reversed_bits()
+
+# Pixel doubling tables for scaled drawing
+_EXPAND2 = b'\x00\x03\x0c\x0f\x30\x33\x3c\x3f\xc0\xc3\xcc\xcf\xf0\xf3\xfc\xff' # nibble -> byte
+_EXPAND4 = b'\x00\x0f\xf0\xff' # 2 bits -> byte
+
+# 4x4 Bayer matrix for ordered dithering
+_BAYER4 = b'\x00\x08\x02\x0a\x0c\x04\x0e\x06\x03\x0b\x01\x09\x0f\x07\x0d\x05'
+
+# 8x8 fill patterns for the *_pattern functions, one byte per row, MSB left
+PATTERN_SOLID  = b'\xff\xff\xff\xff\xff\xff\xff\xff'
+PATTERN_GRAY75 = b'\x77\xff\xdd\xff\x77\xff\xdd\xff'
+PATTERN_GRAY50 = b'\xaa\x55\xaa\x55\xaa\x55\xaa\x55'
+PATTERN_GRAY25 = b'\x88\x00\x22\x00\x88\x00\x22\x00'
+PATTERN_HATCH  = b'\x80\x40\x20\x10\x08\x04\x02\x01' # diagonal lines
+PATTERN_CROSS  = b'\xff\x80\x80\x80\xff\x08\x08\x08' # bricks
+_PATTERN_CLEAR = bytes( 8 )
+
+def _div0( a, b ):
+    ''' Integer division rounded toward zero, like C '''
+    q = abs( a ) // abs( b )
+    return q if ( a < 0 ) == ( b < 0 ) else -q
+
+def _isqrt( n ):
+    ''' Integer square root without floats '''
+    if n <= 0:
+        return 0
+    x = n
+    y = ( x + 1 ) >> 1
+    while y < x:
+        x = y
+        y = ( x + n // x ) >> 1
+    return x
+
+def _disc_widths( r ):
+    ''' Half width of every row of a disc of radius r, rows 0..r from the center '''
+    half = array( 'h', [0] * ( r + 1 ) )
+    x = r
+    limit = r * r + r
+    for dy in range( r + 1 ):
+        while x * x + dy * dy > limit:
+            x -= 1
+        half[dy] = x
+    return half
+
+def _half_plane( a, b, y ):
+    ''' Interval of x where a * x + b * y >= 0, None if empty '''
+    k = b * y
+    if a > 0:
+        return ( -( k // a ), 0x3FFF )
+    if a < 0:
+        return ( -0x3FFF, k // -a )
+    return ( -0x3FFF, 0x3FFF ) if k >= 0 else None
+
+def dither_pattern( level ):
+    ''' Ordered dither pattern of a gray level 0 (white) .. 16 (black) '''
+    pattern = bytearray( 8 )
+    for row in range( 8 ):
+        bits = 0
+        for col in range( 8 ):
+            if _BAYER4[( row & 3 ) * 4 + ( col & 3 )] < level:
+                bits |= 0x80 >> col
+        pattern[row] = bits
+    return bytes( pattern )
+
 class LCD240128( FrameBuffer ):
 
     GPIO_OUT_REG = const(0xD0000010) # Output value registers (for Raspberry Pi Pico)
@@ -77,11 +171,23 @@ class LCD240128( FrameBuffer ):
         self._rotation = rotation
         self._text_wrap = False
         self._font = None
-        
-        # Alternative inverted palette for draw text
-        self._palette = FrameBuffer( bytearray(2), 2, 1, MONO_HLSB )
-        self._palette.pixel(0, 0, 1) # bg = 1
-        self._palette.pixel(1, 0, 0) # fg = 0        
+        self._font_data = None
+        self._font_offsets = None
+        self._font_widths = None
+        self._font_codes = None
+        self._font_stride = 0
+        self._font_width = 0
+        self._font_min = 0
+        self._font_max = 0
+        self._font_hmap = True
+        self._font_lsb = 0
+        self._font_tables = {} # glyph tables of the fonts already set
+        self._scale_buf = bytearray(0)
+        self._clip = array( 'H', [0, 0, LCD_WIDTH, LCD_HEIGHT] ) # x0, y0, x1, y1
+        self._clip_stack = []
+        self._row_buf = bytearray(0)
+        self._dirty = bytearray( _NO_DIRTY )
+        self._page = 0 # display RAM address of the graphic page _send writes to
             
         if rotation == 1:
             pxl_direct = MONO_HMSB
@@ -111,6 +217,11 @@ class LCD240128( FrameBuffer ):
         self.set_command( 0x80 ) # mode set: 0 or 1 xor 3 and | 0x08 ext cg
         #self.set_command( 0xD0, 1, LCD_FIX0 ) # reverse on/off
         
+    def _reinit( self ):
+        ''' Display init again: another display of an LCDBus has reset it '''
+        self.BYTE2GPIO = self.generate_byte2gpio() # with the new CE pin high
+        self._init()
+        
     def init_text_mode( self ):
         ''' Text mode init '''
         self.reset()
@@ -144,7 +255,9 @@ class LCD240128( FrameBuffer ):
         self.cd.value(0)
         self.rd.value(1)
         
-        empty_mask = self.current_gpio_state()
+        # Data pins excluded: they still hold the last byte written, a
+        # command of another display on the same bus
+        empty_mask = self.current_gpio_state() & ~self.convert_byte2gpio( 0xFF )
 
         self.wr.value(1)
         self.ce.value(1)
@@ -276,9 +389,107 @@ class LCD240128( FrameBuffer ):
         self.wait_for_ready()
         self.lcd_write( cmd, 1 )
 
-    @micropython.viper
+    def set_buffer( self, buffer ):
+        """ Draw to and send another buffer, nothing is copied
+        The FrameBuffer is made again over the new buffer; the dirty area
+        is kept, show() sends the whole new buffer.
+        Args
+        buffer (bytearray): LCD_BUFFSIZE bytes in the layout of this rotation
+        Return (bytearray): The previous buffer
+        """
+        if len( buffer ) < LCD_BUFFSIZE:
+            print( "Buffer too small:", len( buffer ) )
+            return None
+        previous = self.buffer
+        self.buffer = buffer
+        pxl_direct = MONO_HMSB if self._rotation == 1 else MONO_HLSB
+        super().__init__( buffer, self.width, self.height, pxl_direct )
+        return previous
+        
     def show( self ):
         ''' Send FrameBuffer to LCD '''
+        self._send( 0, LCD_BUFFSIZE )
+        self._dirty[:] = _NO_DIRTY
+        
+    def show_rect( self, x, y, w, h ):
+        """ Send part of FrameBuffer to LCD
+        Whole bytes around the rectangle are sent, row by row or in one
+        auto write if it spans the screen width
+        Args
+        x (int): Start X position
+        y (int): Start Y position
+        w (int): Width
+        h (int): Height
+        """
+        col0 = max( x, 0 ) >> 3
+        col1 = ( min( x + w, LCD_WIDTH ) + 7 ) >> 3
+        row0 = max( y, 0 )
+        row1 = min( y + h, LCD_HEIGHT )
+        if col0 >= col1 or row0 >= row1:
+            return
+        
+        if col1 - col0 == LCD_COLUMNS:
+            self._send( row0 * LCD_COLUMNS, ( row1 - row0 ) * LCD_COLUMNS )
+        else:
+            for row in range( row0, row1 ):
+                self._send( row * LCD_COLUMNS + col0, col1 - col0 )
+
+    def mark_dirty( self, x, y, w, h ):
+        """ Add a rectangle to the area sent by show_dirty
+        Args
+        x (int): Start X position
+        y (int): Start Y position
+        w (int): Width
+        h (int): Height
+        """
+        col0 = max( x, 0 ) >> 3
+        col1 = ( min( x + w, LCD_WIDTH ) + 7 ) >> 3
+        row0 = max( y, 0 )
+        row1 = min( y + h, LCD_HEIGHT )
+        if col0 >= col1:
+            return
+        
+        dirty = self._dirty
+        for row in range( row0 * 2, row1 * 2, 2 ):
+            if dirty[row] > col0:
+                dirty[row] = col0
+            if dirty[row + 1] < col1:
+                dirty[row + 1] = col1
+                
+    def show_dirty( self ):
+        """ Send the dirty area to LCD and clear it
+        Dirty bytes of a row are one span, spans closer than DIRTY_GAP
+        bytes go in one auto write
+        """
+        dirty = self._dirty
+        start = 0
+        end = -1
+        for row in range( LCD_HEIGHT ):
+            col0 = dirty[row * 2]
+            col1 = dirty[row * 2 + 1]
+            if col0 >= col1:
+                continue
+            
+            first = row * LCD_COLUMNS + col0
+            if end >= 0 and first - end <= DIRTY_GAP:
+                end = row * LCD_COLUMNS + col1
+            else:
+                if end >= 0:
+                    self._send( start, end - start )
+                start = first
+                end = row * LCD_COLUMNS + col1
+                
+        if end >= 0:
+            self._send( start, end - start )
+        dirty[:] = _NO_DIRTY
+
+    @micropython.viper
+    def _send( self, start:int, count:int ):
+        ''' Send bytes of FrameBuffer to LCD
+        Args
+        start (int): First buffer byte
+        count (int): Number of bytes
+        '''
         rotation = int( self._rotation )
         buffer = ptr8( self.buffer )
         
@@ -296,10 +507,17 @@ class LCD240128( FrameBuffer ):
         check_state = byte2gpio[0] + cd_bit + wr_bit
         all_pins_out = GPIO_OE[0]
         
-        self.set_command( 0x24, 0, 0 )
+        # Display address of the first byte: rotated buffer is sent back to front
+        if rotation == 1:
+            addr = LCD_BUFFSIZE - start - count
+        else:
+            addr = start
+
+        page = int( self._page )
+        self.set_command( 0x24, ( page + addr ) & 0xFF, ( page + addr ) >> 8 )
         self.set_command( 0xB0 ) # Auto Write - Start
         
-        for i in range( LCD_BUFFSIZE ):
+        for i in range( count ):
             # check ready to write
             GPIO_OE[0] = all_pins_out - db3_bit # Set db3 pin = IN
             sleep_us(1) # to fast for lcd            
@@ -316,9 +534,9 @@ class LCD240128( FrameBuffer ):
             
             #Preparing gpio state for every buffer byte
             if rotation == 1:
-                gpio = byte2gpio[ buffer[ LCD_BUFFSIZE - 1 - i ] ]
+                gpio = byte2gpio[ buffer[ LCD_BUFFSIZE - 1 - addr - i ] ]
             else:
-                gpio = byte2gpio[ buffer[ i ] ]
+                gpio = byte2gpio[ buffer[ addr + i ] ]
             # Set new gpio states
             GPIO_OUT[0] = gpio
             GPIO_OUT[0] = gpio | wr_bit # Set wr = 1
@@ -334,24 +552,150 @@ class LCD240128( FrameBuffer ):
     """ ADDITIONAL FUNCTIONS """
  
     def set_font(self, font):
-        """ Set font for text
+        """ Set font for text and build its glyph tables
         Args
-        font (module): Font module generated by font_to_py.py
+        font (module): Font module generated by font_to_py.py, None: no font
         """
         self._font = font
+        if font is None:
+            return
+        tables = self._font_tables.get( font )
+        if tables is not None: # built before: switching fonts is cheap
+            ( self._font_data, self._font_min, self._font_max, self._font_codes,
+              self._font_stride, self._font_width, self._font_hmap, self._font_lsb,
+              self._font_offsets, self._font_widths ) = tables
+            return
+        self._font_data = font._font
+        self._font_min = font.min_ch()
+        self._font_max = font.max_ch()
+        self._font_codes = None
+        self._font_stride = 0
+        self._font_hmap = font.hmap()
+        # LSB first: reversed horizontal or normal vertical mapping
+        self._font_lsb = BLIT_LSB if font.hmap() == font.reverse() else 0
+        
+        data = font._font
+        offsets = array( 'H' ) # start of glyph bitmap in font data
+        widths  = array( 'H' ) # glyph widths
+        
+        if hasattr( font, '_sparse' ): # large charset: sorted (code, offset) pairs
+            sparse = font._sparse
+            codes = array( 'H', [0] ) # index 0 = default glyph at data[0]
+            offsets.append( 2 )
+            widths.append( data[0] | ( data[1] << 8 ) )
+            for i in range( 0, len( sparse ), 4 ):
+                doff = sparse[i + 2] | ( sparse[i + 3] << 8 )
+                codes.append( sparse[i] | ( sparse[i + 1] << 8 ) )
+                offsets.append( doff + 2 )
+                widths.append( data[doff] | ( data[doff + 1] << 8 ) )
+            self._font_codes = codes
+        else: # index 0 = default glyph, then min_ch..max_ch, then end offset
+            index = font._index
+            for i in range( 0, len( index ) - 2, 2 ):
+                doff = index[i] | ( index[i + 1] << 8 )
+                offsets.append( doff + 2 )
+                widths.append( data[doff] | ( data[doff + 1] << 8 ) )
+                
+            if font.monospaced() and len( offsets ) > 1:
+                # Equal sized glyphs without gaps: offset = index * stride + 2
+                stride = offsets[1] - offsets[0]
+                fixed = True
+                for i in range( len( offsets ) ):
+                    if offsets[i] != i * stride + 2:
+                        fixed = False
+                        break
+                if fixed:
+                    self._font_stride = stride
+                    self._font_width = widths[0]
+                    offsets = None
+                    widths = None
+                
+        self._font_offsets = offsets
+        self._font_widths  = widths
+        self._font_tables[font] = ( self._font_data, self._font_min, self._font_max,
+            self._font_codes, self._font_stride, self._font_width, self._font_hmap,
+            self._font_lsb, offsets, widths )
+        
+    def _glyph_index(self, code):
+        """ Binary search of a sparse font character
+        Args
+        code (int): Character code
+        Return (int): Index in glyph tables, 0 = default glyph
+        """
+        codes = self._font_codes
+        low  = 1
+        high = len( codes ) - 1
+        while low <= high:
+            mid = ( low + high ) >> 1
+            value = codes[mid]
+            if value == code:
+                return mid
+            if value < code:
+                low = mid + 1
+            else:
+                high = mid - 1
+        return 0
+
+    def _glyph(self, char):
+        """ Find a glyph in the font tables
+        Args
+        char (str): Character
+        Return (tuple): Offset of glyph data, glyph width
+        """
+        code = ord( char )
+        if self._font_codes != None:
+            i = self._glyph_index( code )
+        elif self._font_min <= code <= self._font_max:
+            i = code - self._font_min + 1
+        else:
+            i = 0
+            
+        stride = self._font_stride
+        if stride:
+            return i * stride + 2, self._font_width
+        return self._font_offsets[i], self._font_widths[i]
+
+    def push_clip(self, x, y, w, h):
+        """ Restrict driver drawing to a rectangle inside the current clip
+        Args
+        x (int): Start X position
+        y (int): Start Y position
+        w (int): Width
+        h (int): Height
+        """
+        clip = self._clip
+        x0 = max( x, clip[0] )
+        y0 = max( y, clip[1] )
+        x1 = max( x0, min( x + w, clip[2] ) )
+        y1 = max( y0, min( y + h, clip[3] ) )
+        self._clip_stack.append( clip )
+        self._clip = array( 'H', [x0, y0, x1, y1] )
+        
+    def pop_clip(self):
+        """ Restore the clip rectangle active before the last push_clip() """
+        if self._clip_stack:
+            self._clip = self._clip_stack.pop()
+        else:
+            self._clip = array( 'H', [0, 0, LCD_WIDTH, LCD_HEIGHT] )
+
+    def _clipped(self, x, y, w, h):
+        """ Check that a rectangle is completely outside the clip """
+        clip = self._clip
+        return x >= clip[2] or y >= clip[3] or x + w <= clip[0] or y + h <= clip[1]
 
     def set_text_wrap(self, on = True):
         """ Set text wrapping """
         self._text_wrap = bool( on )  
 
-    def draw_text(self, text, x, y, color = 1):
+    def draw_text(self, text, x, y, color = 1, scale = 1):
         """ Draw text on framebuffer
         Args
         x (int) : Start X position
         y (int) : Start Y position
+        color (int): Color 0 or 1
+        scale (int): Integer scale factor, 1 = original size
         """
         x_start = x
-        screen_height = self.height
         screen_width  = self.width
         wrap = self._text_wrap
         
@@ -361,45 +705,325 @@ class LCD240128( FrameBuffer ):
             print("Font not set")
             return False
         
-        palette = self._palette
+        hmap = self._font_hmap
+        if scale > 1 and not hmap:
+            print("Scaling needs a horizontally mapped font")
+            return False
+        
+        data   = self._font_data
+        height = font.height()
+        glyph_height = height * scale
+        # LSB first: reversed horizontal or normal vertical mapping
+        mode = color | BLIT_OPAQUE | self._font_lsb
 
-        for char in text:   
-            glyph = font.get_ch(char)
-            glyph_height = glyph[1]
-            glyph_width  = glyph[2]
-                
+        for char in text:
+            offset, width = self._glyph( char )
+            glyph_width = width * scale
+            
             if char == " ": # double size for space
                 x += glyph_width
                 
             if wrap and (x + glyph_width > screen_width): # End of row
                 x = x_start
                 y += glyph_height                
+
+            if y >= self._clip[3] or ( not wrap and x >= self._clip[2] ): # End of clip
+                break
             
-            fb = FrameBuffer( bytearray(glyph[0]), glyph_width, glyph_height, MONO_HLSB)
-            if color:
-                self.blit(fb, x, y)
+            if self._clipped( x, y, glyph_width, glyph_height ):
+                pass
+            elif not hmap:
+                self._blit_columns( data, offset, ( height + 7 ) >> 3, width, height, x, y, mode )
+            elif scale > 1:
+                self._draw_scaled( data, offset, ( width + 7 ) >> 3, width, height, x, y, mode, scale )
             else:
-                self.blit(fb, x, y, -1, palette)
-            
+                self._blit_bits( data, offset, ( width + 7 ) >> 3, width, height, x, y, mode )
             x += glyph_width
 
+    def draw_text_vertical(self, text, x, y, color = 1):
+        """ Draw text rotated by 90 degrees, reading from bottom to top
+        Args
+        x (int) : Left X position of the text line
+        y (int) : Bottom Y position where the text starts
+        color (int): Color 0 or 1
+        """
+        font = self._font
+
+        if font == None:
+            print("Font not set")
+            return False
+        
+        data   = self._font_data
+        height = font.height()
+        mode   = color | BLIT_OPAQUE | self._font_lsb
+        
+        for char in text:
+            offset, width = self._glyph( char )
+            
+            if char == " ": # double size for space
+                y -= width
+            
+            if y < self._clip[1]: # End of clip
+                break
+            
+            if self._clipped( x, y - width + 1, height, width ):
+                pass
+            elif self._font_hmap: # glyph rows become screen columns
+                self._blit_columns( data, offset, ( width + 7 ) >> 3, height, width, x, y, mode | BLIT_UP )
+            else: # glyph columns become screen rows, one blit from the last column up
+                column = ( height + 7 ) >> 3
+                self._blit_bits( data, offset + ( width - 1 ) * column, -column, height, width, x, y - width + 1, mode )
+            y -= width
+
+    def _draw_scaled(self, data, offset, stride, width, height, x, y, mode, scale):
+        """ Draw 1-bit horizontal mapped data enlarged by an integer factor
+        Args
+        data   (bytes): Source data
+        offset (int): Offset of the first source row in data
+        stride (int): Bytes per source row
+        width  (int): Source width in pixels
+        height (int): Source height in pixels
+        x      (int): Start X position
+        y      (int): Start Y position
+        mode   (int): _blit_bits mode
+        scale  (int): Scale factor 2, 3, 4...
+        """
+        out_stride = self._scale_bits( data, offset, stride, width, height, scale, mode & BLIT_LSB )
+        self._blit_bits( self._scale_buf, 0, out_stride, width * scale, height * scale, x, y, mode & ~BLIT_LSB )
+
+    @micropython.viper
+    def _scale_bits(self, data, offset:int, stride:int, width:int, height:int, scale:int, lsb:int) -> int:
+        """ Enlarge 1-bit horizontal mapped data into self._scale_buf
+        Args
+        data   (bytes): Source data
+        offset (int): Offset of the first source row in data
+        stride (int): Bytes per source row
+        width  (int): Source width in pixels
+        height (int): Source height in pixels
+        scale  (int): Scale factor 2, 3, 4...
+        lsb    (int): Source bytes are LSB first, the result is always MSB first
+        Return (int): Bytes per row of the enlarged data
+        """
+        in_bytes   = ( width + 7 ) >> 3
+        out_stride = in_bytes * scale
+        size = out_stride * height * scale
+        if int( len( self._scale_buf ) ) < size:
+            self._scale_buf = bytearray( size )
+        
+        dst = ptr8( self._scale_buf )
+        src = ptr8( data )
+        expand2 = ptr8( _EXPAND2 )
+        expand4 = ptr8( _EXPAND4 )
+        rev = ptr8( _REV8 )
+        
+        for row in range( height ):
+            line = offset + row * stride
+            out  = row * scale * out_stride
+            if scale == 2: # nibble -> byte
+                for j in range( in_bytes ):
+                    byte = src[line + j]
+                    if lsb:
+                        byte = rev[byte]
+                    dst[out]     = expand2[byte >> 4]
+                    dst[out + 1] = expand2[byte & 0x0F]
+                    out += 2
+            elif scale == 4: # 2 bits -> byte
+                for j in range( in_bytes ):
+                    byte = src[line + j]
+                    if lsb:
+                        byte = rev[byte]
+                    dst[out]     = expand4[byte >> 6]
+                    dst[out + 1] = expand4[( byte >> 4 ) & 3]
+                    dst[out + 2] = expand4[( byte >> 2 ) & 3]
+                    dst[out + 3] = expand4[byte & 3]
+                    out += 4
+            else: # any other factor, bit by bit
+                for j in range( out_stride ):
+                    dst[out + j] = 0
+                for col in range( width ):
+                    byte = src[line + ( col >> 3 )]
+                    if lsb:
+                        byte = rev[byte]
+                    if byte & ( 0x80 >> ( col & 7 ) ):
+                        pos = col * scale
+                        for k in range( scale ):
+                            addr = out + ( pos >> 3 )
+                            dst[addr] = dst[addr] | ( 0x80 >> ( pos & 7 ) )
+                            pos += 1
+                out += out_stride
+            
+            # Repeat the row vertically
+            out -= out_stride
+            first = out
+            for k in range( 1, scale ):
+                out += out_stride
+                for j in range( out_stride ):
+                    dst[out + j] = dst[first + j]
+        
+        return out_stride
+
     @micropython.viper
-    def draw_bitmap(self, bitmap, x:int, y:int, color:int):
+    def _blit_bits(self, data, offset:int, stride:int, width:int, height:int, x:int, y:int, mode:int):
+        """ Byte-wise blit of 1-bit horizontal mapped data to framebuffer
+        Args
+        data   (bytes): Source data
+        offset (int): Offset of the first source row in data
+        stride (int): Bytes per source row, negative for bottom-up data
+        width  (int): Width in pixels
+        height (int): Height in pixels
+        x      (int): Start X position
+        y      (int): Start Y position
+        mode   (int): Color 0 or 1, | BLIT_OPAQUE, | BLIT_LSB
+        """
+        buf = ptr8( self.buffer )
+        src = ptr8( data )
+        rev = ptr8( _REV8 )
+        hmsb = int( self._rotation ) == 1
+        color  = mode & 1
+        opaque = mode & BLIT_OPAQUE
+        lsb    = mode & BLIT_LSB
+        
+        # Part of the source inside the clip rectangle
+        clip = ptr16( self._clip )
+        col0 = 0
+        row0 = 0
+        col1 = width
+        row1 = height
+        if x < clip[0]:
+            col0 = clip[0] - x
+        if y < clip[1]:
+            row0 = clip[1] - y
+        if x + width > clip[2]:
+            col1 = clip[2] - x
+        if y + height > clip[3]:
+            row1 = clip[3] - y
+        if col0 >= col1 or row0 >= row1:
+            return
+        
+        fill = 0
+        if color:
+            fill = 0xFF
+        
+        for row in range( row0, row1 ):
+            line = offset + row * stride
+            dest = ( y + row ) * LCD_COLUMNS
+            for j in range( col0 >> 3, ( col1 + 7 ) >> 3 ):
+                bits = src[line + j]
+                if lsb:
+                    bits = rev[bits]
+                # Mask of visible source pixels in this byte
+                col = j << 3
+                mask = 0xFF
+                if col < col0:
+                    mask = mask >> ( col0 - col )
+                if col + 8 > col1:
+                    mask = mask & ( 0xFF << ( col + 8 - col1 ) )
+                
+                if opaque:
+                    value = bits ^ fill ^ 0xFF
+                else:
+                    mask  = mask & bits
+                    value = fill
+                if mask == 0:
+                    continue
+                
+                # Split the byte between two framebuffer bytes
+                xpos  = x + col
+                shift = xpos & 7
+                addr  = dest + ( xpos >> 3 )
+                
+                part = mask >> shift
+                if part:
+                    byte = buf[addr]
+                    if hmsb:
+                        byte = rev[byte]
+                    byte = ( byte & ( part ^ 0xFF ) ) | ( ( value >> shift ) & part )
+                    if hmsb:
+                        byte = rev[byte]
+                    buf[addr] = byte
+                
+                part = ( mask << ( 8 - shift ) ) & 0xFF
+                if part:
+                    byte = buf[addr + 1]
+                    if hmsb:
+                        byte = rev[byte]
+                    byte = ( byte & ( part ^ 0xFF ) ) | ( ( value << ( 8 - shift ) ) & part )
+                    if hmsb:
+                        byte = rev[byte]
+                    buf[addr + 1] = byte
+
+    @micropython.viper
+    def _blit_columns(self, data, offset:int, stride:int, count:int, length:int, x:int, y:int, mode:int):
+        """ Draw 1-bit data stored column by column (vertical mapped fonts)
+        Args
+        data   (bytes): Source data
+        offset (int): Offset of the first column in data
+        stride (int): Bytes per column
+        count  (int): Number of columns
+        length (int): Pixels per column
+        x      (int): X position of the first column
+        y      (int): Y position of the first pixel of every column
+        mode   (int): Color 0 or 1, | BLIT_OPAQUE, | BLIT_LSB, | BLIT_UP
+        """
+        buf = ptr8( self.buffer )
+        src = ptr8( data )
+        hmsb = int( self._rotation ) == 1
+        color  = mode & 1
+        opaque = mode & BLIT_OPAQUE
+        lsb    = mode & BLIT_LSB
+        step = 1
+        if mode & BLIT_UP:
+            step = -1
+        clip = ptr16( self._clip )
+        x0 = clip[0]
+        y0 = clip[1]
+        x1 = clip[2]
+        y1 = clip[3]
+        
+        for col in range( count ):
+            xpos = x + col
+            if xpos < x0 or xpos >= x1:
+                continue
+            if hmsb:
+                bit = 1 << ( xpos & 7 )
+            else:
+                bit = 0x80 >> ( xpos & 7 )
+            addr = xpos >> 3
+            line = offset + col * stride
+            ypos = y
+            for k in range( length ):
+                if ypos >= y0 and ypos < y1:
+                    byte = src[line + ( k >> 3 )]
+                    if lsb:
+                        on = ( byte >> ( k & 7 ) ) & 1
+                    else:
+                        on = ( byte >> ( 7 - ( k & 7 ) ) ) & 1
+                    if on or opaque:
+                        i = ypos * LCD_COLUMNS + addr
+                        if on == color:
+                            buf[i] = buf[i] | bit
+                        else:
+                            buf[i] = buf[i] & ( bit ^ 0xFF )
+                ypos += step
+
+    def draw_bitmap(self, bitmap, x, y, color, scale = 1):
         """ Draw a bitmap on framebuffer
         Args
         bitmap (bytes): Bitmap data
         x      (int): Start X position
         y      (int): Start Y position
         color  (int): Color 0 or 1
+        scale  (int): Integer scale factor, 1 = original size
         """
-        fb = FrameBuffer( bitmap[0], bitmap[2], bitmap[1], MONO_HLSB )
-        if color:
-            self.blit(fb, x, y)
-        else:            
-            self.blit(fb, x, y, -1, self._palette)
+        if scale > 1:
+            width = bitmap[2]
+            self._draw_scaled( bitmap[0], 0, ( width + 7 ) >> 3, width, bitmap[1], x, y, color | BLIT_OPAQUE, scale )
+            return
+        
+        width = bitmap[2]
+        self._blit_bits( bitmap[0], 0, ( width + 7 ) >> 3, width, bitmap[1], x, y, color | BLIT_OPAQUE )
 
-    @micropython.viper
-    def draw_bitmap_trans(self, bitmap, x:int, y:int, color:int):
+    def draw_bitmap_trans(self, bitmap, x, y, color):
         """ Draw a transparent bitmap on display
         Args
         bitmap (bytes): Bitmap data
@@ -407,93 +1031,1565 @@ class LCD240128( FrameBuffer ):
         y      (int): Start Y position
         color  (int): Color 0 or 1
         """
-        data   = ptr8(bitmap[0]) #memoryview to bitmap
-        height = int(bitmap[1])
-        width  = int(bitmap[2])
+        width = bitmap[2]
+        self._blit_bits( bitmap[0], 0, ( width + 7 ) >> 3, width, bitmap[1], x, y, color )
+
+    def draw_icon(self, atlas, icon, x, y, color = 1, scale = 1):
+        """ Draw an icon straight from an atlas
+        Args
+        atlas  (module): Atlas module or Atlas object made by tools/bitmap_atlas.py
+        icon   (int): Icon id, example: icons.SUN
+        x      (int): Start X position
+        y      (int): Start Y position
+        color  (int): Color 0 or 1
+        scale  (int): Integer scale factor, 1 = original size
+        """
+        offset, width, height = unpack_from( '<IHH', atlas.index, icon * 8 )
+        if scale > 1:
+            self._draw_scaled( atlas.data, offset, ( width + 7 ) >> 3, width, height, x, y, color | BLIT_OPAQUE, scale )
+        else:
+            self._blit_bits( atlas.data, offset, ( width + 7 ) >> 3, width, height, x, y, color | BLIT_OPAQUE )
+
+    def draw_image(self, cache, filename, x, y, color = 1, dither = DITHER_FS):
+        """ Draw BMP or raw image through a cache of decoded images
+        The file is only read when it is not in the cache, has changed or
+        was decoded with another dither mode
+        Args
+        cache  (ImageCache): Decoded images
+        filename (string): filename of image, example: "menu.bmp"
+        x      (int): Start X position
+        y      (int): Start Y position
+        color  (int): Color 0 or 1
+        dither (int): Grayscale images: DITHER_BAYER or DITHER_FS
+        """
+        bitmap = cache.get( filename, dither )
+        if bitmap is None:
+            bitmap = self._decode_image( filename, dither )
+            if bitmap is None:
+                return
+            cache.put( filename, bitmap, dither )
+            
+        data, height, width = bitmap
+        self._blit_bits( data, 0, ( width + 7 ) >> 3, width, height, x, y, color | BLIT_OPAQUE )
+
+    @micropython.viper
+    def draw_tilemap( self, tilemap ) -> int:
+        """ Draw the cells of a tile map changed since the last draw, tiles
+        are copied byte by byte into the framebuffer and marked dirty.
+        Only the pixels inside the clip rectangle are drawn, a cell is done
+        even if the clip hides part of it
+        Args
+        tilemap (TileMap): Tile map
+        Return (int): Number of cells drawn
+        """
+        buf   = ptr8( self.buffer )
+        rev   = ptr8( _REV8 )
+        dirty = ptr8( self._dirty )
+        hmsb  = int( self._rotation ) == 1
+        
+        atlas = tilemap.atlas
+        data  = ptr8( atlas.data )
+        index = ptr8( atlas.index )
+        cells = ptr8( tilemap.cells )
+        drawn = ptr8( tilemap._drawn )
+        cols   = int( tilemap.cols )
+        rows   = int( tilemap.rows )
+        left   = int( tilemap.x ) >> 3 # byte column
+        top    = int( tilemap.y )
+        stride = int( tilemap.tile_width ) >> 3
+        height = int( tilemap.tile_height )
+        
+        # Clip: byte columns lcol..rcol, the edge bytes are masked
+        clip = ptr16( self._clip )
+        ctop    = int( clip[1] )
+        cbottom = int( clip[3] )
+        lcol = int( clip[0] ) >> 3
+        rcol = ( int( clip[2] ) - 1 ) >> 3
+        lmask = 0xFF >> ( int( clip[0] ) & 7 )
+        rmask = ( 0xFF << ( 7 - ( ( int( clip[2] ) - 1 ) & 7 ) ) ) & 0xFF
+        if lcol == rcol:
+            lmask = lmask & rmask
+            rmask = lmask
+        
+        count = 0
+        for row in range( rows ):
+            for col in range( cols ):
+                i = row * cols + col
+                tile = cells[i]
+                if tile == drawn[i]:
+                    continue
+                drawn[i] = tile
+                count += 1
+                
+                entry = tile << 3
+                src = index[entry] | ( index[entry + 1] << 8 ) | ( index[entry + 2] << 16 ) | ( index[entry + 3] << 24 )
+                
+                # Part of the tile inside the clip
+                bx = left + col * stride
+                by = top + row * height
+                col0 = 0
+                col1 = stride
+                row0 = 0
+                row1 = height
+                if bx < lcol:
+                    col0 = lcol - bx
+                if bx + stride > rcol + 1:
+                    col1 = rcol + 1 - bx
+                if by < ctop:
+                    row0 = ctop - by
+                if by + height > cbottom:
+                    row1 = cbottom - by
+                if col0 >= col1 or row0 >= row1:
+                    continue
+                
+                for r in range( row0, row1 ):
+                    line = src + r * stride
+                    dest = ( by + r ) * LCD_COLUMNS + bx
+                    for c in range( col0, col1 ):
+                        value = data[line + c]
+                        if bx + c == lcol or bx + c == rcol:
+                            mask = 0xFF
+                            if bx + c == lcol:
+                                mask = lmask
+                            if bx + c == rcol:
+                                mask = mask & rmask
+                            old = buf[dest + c]
+                            if hmsb:
+                                old = rev[old]
+                            value = ( old & ( mask ^ 0xFF ) ) | ( value & mask )
+                        if hmsb:
+                            value = rev[value]
+                        buf[dest + c] = value
+                            
+                    # Dirty bytes of the row
+                    k = ( by + r ) << 1
+                    if dirty[k] > bx + col0:
+                        dirty[k] = bx + col0
+                    if dirty[k + 1] < bx + col1:
+                        dirty[k + 1] = bx + col1
+        return count
+
+    def make_sprite(self, bitmap, outline = 1):
+        """ Make a sprite from a bitmap, the mask is the bitmap grown by outline pixels
+        Args
+        bitmap  (bytes): Bitmap data
+        outline (int): Width of the cleared border around the bitmap pixels
+        Return (tuple): Bitmap data, mask data, height, width
+        """
+        data, height, width = bitmap
+        stride = ( width + 7 ) >> 3
+        pad  = stride * 8 - width
+        full = ( ( 1 << width ) - 1 ) << pad
+        rows = [int.from_bytes( data[i * stride : ( i + 1 ) * stride], 'big' ) & full for i in range( height )]
+        
+        for _ in range( outline ):
+            grown = []
+            for i in range( height ):
+                row = rows[i]
+                if i > 0:
+                    row |= rows[i - 1]
+                if i < height - 1:
+                    row |= rows[i + 1]
+                grown.append( ( row | ( row << 1 ) | ( row >> 1 ) ) & full )
+            rows = grown
+        
+        mask = bytearray()
+        for row in rows:
+            mask += row.to_bytes( stride, 'big' )
+        return data, mask, height, width
+
+    def draw_sprite(self, sprite, x, y, color = 1):
+        """ Draw a sprite: pixels under the mask are replaced by the sprite bitmap
+        Args
+        sprite (tuple): Bitmap data, mask data, height, width (see make_sprite)
+        x      (int): Start X position
+        y      (int): Start Y position
+        color  (int): Color of the bitmap pixels 0 or 1
+        """
+        data, mask, height, width = sprite
+        self._blit_masked( data, mask, width, height, x, y, color )
+
+    @micropython.viper
+    def _blit_masked(self, data, mask, width:int, height:int, x:int, y:int, color:int):
+        """ Byte-wise blit of bitmap and mask: dst = (dst & ~mask) | (bits & mask)
+        Args
+        data   (bytes): Bitmap data
+        mask   (bytes): Mask data, same size as bitmap
+        width  (int): Width in pixels
+        height (int): Height in pixels
+        x      (int): Start X position
+        y      (int): Start Y position
+        color  (int): Color of the bitmap pixels 0 or 1
+        """
+        buf = ptr8( self.buffer )
+        src = ptr8( data )
+        msk = ptr8( mask )
+        rev = ptr8( _REV8 )
+        hmsb = int( self._rotation ) == 1
+        stride = ( width + 7 ) >> 3
+        
+        # Part of the sprite inside the clip rectangle
+        clip = ptr16( self._clip )
+        col0 = 0
+        row0 = 0
+        col1 = width
+        row1 = height
+        if x < clip[0]:
+            col0 = clip[0] - x
+        if y < clip[1]:
+            row0 = clip[1] - y
+        if x + width > clip[2]:
+            col1 = clip[2] - x
+        if y + height > clip[3]:
+            row1 = clip[3] - y
+        if col0 >= col1 or row0 >= row1:
+            return
+        
+        invert = 0xFF
+        if color:
+            invert = 0
+        
+        for row in range( row0, row1 ):
+            line = row * stride
+            dest = ( y + row ) * LCD_COLUMNS
+            for j in range( col0 >> 3, ( col1 + 7 ) >> 3 ):
+                col = j << 3
+                mask_bits = msk[line + j]
+                if col < col0:
+                    mask_bits = mask_bits & ( 0xFF >> ( col0 - col ) )
+                if col + 8 > col1:
+                    mask_bits = mask_bits & ( 0xFF << ( col + 8 - col1 ) )
+                if mask_bits == 0:
+                    continue
+                value = src[line + j] ^ invert
+                
+                # Split the byte between two framebuffer bytes
+                xpos  = x + col
+                shift = xpos & 7
+                addr  = dest + ( xpos >> 3 )
+                
+                part = mask_bits >> shift
+                if part:
+                    byte = buf[addr]
+                    if hmsb:
+                        byte = rev[byte]
+                    byte = ( byte & ( part ^ 0xFF ) ) | ( ( value >> shift ) & part )
+                    if hmsb:
+                        byte = rev[byte]
+                    buf[addr] = byte
+                
+                part = ( mask_bits << ( 8 - shift ) ) & 0xFF
+                if part:
+                    byte = buf[addr + 1]
+                    if hmsb:
+                        byte = rev[byte]
+                    byte = ( byte & ( part ^ 0xFF ) ) | ( ( value << ( 8 - shift ) ) & part )
+                    if hmsb:
+                        byte = rev[byte]
+                    buf[addr + 1] = byte
+
+    def fill_rect_pattern( self, x, y, w, h, pattern, opaque = True ):
+        """ Fill a rectangle with an 8x8 pattern, byte by byte
+        Patterns are aligned to the screen, so touching shapes join seamlessly
+        Args
+        x (int): Start X position
+        y (int): Start Y position
+        w (int): Width
+        h (int): Height
+        pattern (bytes): 8 rows of 8 pixels, example: PATTERN_GRAY50 or dither_pattern( 4 )
+        opaque (bool): Clear the pixels of the pattern 0 bits too
+        """
+        if w > 0 and h > 0:
+            self._fill_spans( array( 'h', [y, y + h, x, x + w] ), 1, pattern, FILL_OPAQUE if opaque else FILL_OR )
+        
+    def rect_pattern( self, x, y, w, h, pattern, c = 1, opaque = True ):
+        """ Rectangle with an outline of color c filled with an 8x8 pattern: a shaded bar
+        Args
+        x, y, w, h (int): Rectangle
+        pattern (bytes): 8 rows of 8 pixels
+        c (int): Outline color 0 or 1
+        opaque (bool): Clear the pixels of the pattern 0 bits too
+        """
+        self.rect( x, y, w, h, c )
+        self.fill_rect_pattern( x + 1, y + 1, w - 2, h - 2, pattern, opaque )
+        
+    def ellipse_pattern( self, x, y, xr, yr, pattern, m = 0x0f, opaque = True ):
+        """ Ellipse filled with an 8x8 pattern, same pixels as ellipse( x, y, xr, yr, c, True, m )
+        Args
+        x, y (int): Center
+        xr, yr (int): Radii
+        pattern (bytes): 8 rows of 8 pixels
+        m (int): Quadrants to fill: 1 top right, 2 top left, 4 bottom left, 8 bottom right
+        opaque (bool): Clear the pixels of the pattern 0 bits too
+        """
+        if xr < 0 or yr < 0:
+            return
+        # Half width of every row, stepped like the filled ellipse of modframebuf.c
+        half = array( 'h', [-1] * ( yr + 1 ) )
+        two_a2 = 2 * xr * xr
+        two_b2 = 2 * yr * yr
+        px = xr
+        py = 0
+        xchange = yr * yr * ( 1 - 2 * xr )
+        ychange = xr * xr
+        error = 0
+        stop_x = two_b2 * xr
+        stop_y = 0
+        while stop_x >= stop_y:
+            if half[py] < px:
+                half[py] = px
+            py += 1
+            stop_y += two_a2
+            error += ychange
+            ychange += two_a2
+            if 2 * error + xchange > 0:
+                px -= 1
+                stop_x -= two_b2
+                error += xchange
+                xchange += two_b2
+        px = 0
+        py = yr
+        xchange = yr * yr
+        ychange = xr * xr * ( 1 - 2 * yr )
+        error = 0
+        stop_x = 0
+        stop_y = two_a2 * yr
+        while stop_x <= stop_y:
+            if half[py] < px:
+                half[py] = px
+            px += 1
+            stop_x += two_b2
+            error += xchange
+            xchange += two_b2
+            if 2 * error + ychange > 0:
+                py -= 1
+                stop_y -= two_a2
+                error += ychange
+                ychange += two_a2
+                
+        # One span per row: top half rows y - dy, bottom half rows y + dy
+        spans = array( 'h' )
+        for dy in range( yr, -yr - 1, -1 ):
+            if dy > 0:
+                left, right = m & 2, m & 1
+            elif dy < 0:
+                left, right = m & 4, m & 8
+            else:
+                left, right = m & 6, m & 9
+            size = half[abs( dy )]
+            if size < 0 or not ( left or right ):
+                continue
+            x0 = x - size if left else x
+            x1 = x + size if right else x
+            spans.extend( ( y - dy, y - dy + 1, x0, x1 + 1 ) )
+        self._fill_spans( spans, len( spans ) >> 2, pattern, FILL_OPAQUE if opaque else FILL_OR )
+        
+    def poly_pattern( self, x, y, coords, pattern, opaque = True ):
+        """ Polygon filled with an 8x8 pattern, same pixels as poly( x, y, coords, c, True )
+        Args
+        x, y (int): Position of the polygon
+        coords (array): x, y pairs of the vertices, example: array( 'h', [0, 0, 20, 0, 10, 15] )
+        pattern (bytes): 8 rows of 8 pixels
+        opaque (bool): Clear the pixels of the pattern 0 bits too
+        """
+        n = len( coords ) >> 1
+        if n == 0:
+            return
+        y_min = y_max = coords[1]
+        for i in range( 1, n ):
+            y_min = min( y_min, coords[i * 2 + 1] )
+            y_max = max( y_max, coords[i * 2 + 1] )
+            
+        # Scanline nodes of the edges, like the filled poly of modframebuf.c
+        spans = array( 'h' )
+        nodes = []
+        for py in range( y_min, y_max + 1 ):
+            nodes.clear()
+            px1 = coords[0]
+            py1 = coords[1]
+            for i in range( n - 1, -1, -1 ):
+                px2 = coords[i * 2]
+                py2 = coords[i * 2 + 1]
+                # The bottom pixel of an edge is left out
+                if py1 != py2 and ( ( py1 > py and py2 <= py ) or ( py1 <= py and py2 > py ) ):
+                    node = _div0( 32 * px1 + _div0( 32 * ( px2 - px1 ) * ( py - py1 ), py2 - py1 ) + 16, 32 )
+                    nodes.append( node )
+                elif py == max( py1, py2 ):
+                    # Local minimum or horizontal edge
+                    if py1 < py2:
+                        spans.extend( ( y + py, y + py + 1, x + px2, x + px2 + 1 ) )
+                    elif py2 < py1:
+                        spans.extend( ( y + py, y + py + 1, x + px1, x + px1 + 1 ) )
+                    else:
+                        spans.extend( ( y + py, y + py + 1, x + min( px1, px2 ), x + max( px1, px2 ) + 1 ) )
+                px1 = px2
+                py1 = py2
+            nodes.sort()
+            for i in range( 0, len( nodes ) - 1, 2 ):
+                spans.extend( ( y + py, y + py + 1, x + nodes[i], x + nodes[i + 1] + 1 ) )
+        self._fill_spans( spans, len( spans ) >> 2, pattern, FILL_OPAQUE if opaque else FILL_OR )
+        
+    def thick_line( self, x0, y0, x1, y1, width, c = 1 ):
+        """ Line of any width with square ends, drawn as scanline spans: no pixel is drawn twice
+        Args
+        x0, y0 (int): Start point
+        x1, y1 (int): End point
+        width (int): Width in pixels
+        c (int): Color 0 or 1
+        """
+        if width <= 1:
+            self._clip_line( x0, y0, x1, y1, c )
+            return
+        pattern = PATTERN_SOLID if c else _PATTERN_CLEAR
+        dx = x1 - x0
+        dy = y1 - y0
+        length = _isqrt( ( dx * dx + dy * dy ) << 8 ) # in 1/16 pixels
+        if length == 0:
+            half = width >> 1
+            self._fill_spans( array( 'h', [y0 - half, y0 - half + width, x0 - half, x0 - half + width] ), 1, pattern, FILL_OPAQUE )
+            return
+        
+        # Corners in 1/16 pixels: half a pixel past both ends, half the width to both sides
+        twice = length * 2 # rounded divisions
+        ex = ( dx * 256 + length ) // twice
+        ey = ( dy * 256 + length ) // twice
+        ox = ( -dy * 256 * width + length ) // twice
+        oy = ( dx * 256 * width + length ) // twice
+        ax = x0 * 16 + 8 - ex
+        ay = y0 * 16 + 8 - ey
+        bx = x1 * 16 + 8 + ex
+        by = y1 * 16 + 8 + ey
+        corners = ( ax + ox, ay + oy, bx + ox, by + oy, bx - ox, by - oy, ax - ox, ay - oy )
+        
+        # Pixels whose centers are inside the quad, one span per row
+        top = max( ( min( ay, by ) - abs( oy ) - 8 + 15 ) >> 4, 0 )
+        bottom = min( ( max( ay, by ) + abs( oy ) - 8 + 15 ) >> 4, LCD_HEIGHT )
+        spans = array( 'h' )
+        for row in range( top, bottom ):
+            yc = row * 16 + 8
+            left = 0x7FFF
+            right = -0x7FFF
+            px = corners[6]
+            py = corners[7]
+            for i in range( 0, 8, 2 ):
+                qx = corners[i]
+                qy = corners[i + 1]
+                if ( py <= yc < qy ) or ( qy <= yc < py ):
+                    xc = px + ( 2 * ( qx - px ) * ( yc - py ) + qy - py ) // ( 2 * ( qy - py ) )
+                    left = min( left, xc )
+                    right = max( right, xc )
+                px = qx
+                py = qy
+            col0 = ( left - 8 + 15 ) >> 4
+            col1 = ( right - 8 + 15 ) >> 4
+            if col0 < col1:
+                spans.extend( ( row, row + 1, col0, col1 ) )
+        self._fill_spans( spans, len( spans ) >> 2, pattern, FILL_OPAQUE )
+        
+    def arc( self, x, y, r, start, sweep, width = 1, c = 1 ):
+        """ Arc of a circle or ring segment, drawn as scanline spans: no pixel is drawn twice
+        Angles are degrees clockwise from 12 o'clock like Gauge
+        Args
+        x, y (int): Center
+        r (int): Outer radius
+        start (int): Angle of the arc start
+        sweep (int): Angle from the start to the arc end, negative: counterclockwise, 360: ring
+        width (int): Ring width in pixels, r + 1: pie slice
+        c (int): Color 0 or 1
+        """
+        if r < 0 or width < 1 or sweep == 0:
+            return
+        if sweep < 0:
+            start += sweep
+            sweep = -sweep
+        outer = _disc_widths( r )
+        inner = _disc_widths( r - width ) if width <= r else None
+        full = sweep >= 360
+        if not full:
+            # Angle from start in [0, 180] and angle to end in [0, 180]
+            sin_a = _sin( start )
+            cos_a = _sin( start + 90 )
+            sin_b = _sin( start + sweep )
+            cos_b = _sin( start + sweep + 90 )
+            
+        spans = array( 'h' )
+        for dy in range( max( -r, -y ), min( r, LCD_HEIGHT - 1 - y ) + 1 ):
+            d = outer[abs( dy )]
+            if inner is not None and abs( dy ) < len( inner ):
+                hole = inner[abs( dy )]
+                pieces = ( ( -d, -hole - 1 ), ( hole + 1, d ) )
+            else:
+                pieces = ( ( -d, d ), )
+                
+            if full:
+                sector = ( ( -d, d ), )
+            else:
+                a = _half_plane( cos_a, sin_a, dy )
+                b = _half_plane( -cos_b, -sin_b, dy )
+                if sweep <= 180: # both half planes
+                    if a is None or b is None or max( a[0], b[0] ) > min( a[1], b[1] ):
+                        continue
+                    sector = ( ( max( a[0], b[0] ), min( a[1], b[1] ) ), )
+                elif a is None or b is None: # either half plane
+                    sector = ( a or b, ) if a or b else ()
+                elif a[0] <= b[1] + 1 and b[0] <= a[1] + 1:
+                    sector = ( ( min( a[0], b[0] ), max( a[1], b[1] ) ), )
+                else:
+                    sector = ( a, b ) if a[0] < b[0] else ( b, a )
+                    
+            for low, high in pieces:
+                for s_low, s_high in sector:
+                    x0 = max( low, s_low )
+                    x1 = min( high, s_high )
+                    if x0 <= x1:
+                        spans.extend( ( y + dy, y + dy + 1, x + x0, x + x1 + 1 ) )
+        self._fill_spans( spans, len( spans ) >> 2, PATTERN_SOLID if c else _PATTERN_CLEAR, FILL_OPAQUE )
+        
+    def round_rect( self, x, y, w, h, r, c = 1, f = False ):
+        """ Rectangle with rounded corners, drawn as scanline spans: no pixel is drawn twice
+        Args
+        x, y, w, h (int): Rectangle
+        r (int): Corner radius
+        c (int): Color 0 or 1
+        f (bool): Filled
+        """
+        if w < 1 or h < 1:
+            return
+        r = max( 0, min( r, ( w - 1 ) >> 1, ( h - 1 ) >> 1 ) )
+        outer = _disc_widths( r )
+        inner = _disc_widths( max( r - 1, 0 ) )
+        hollow = not f and w > 2 and h > 2
+        
+        spans = array( 'h' )
+        for row in range( max( y, 0 ), min( y + h, LCD_HEIGHT ) ):
+            d = outer[max( y + r - row, row - ( y + h - 1 - r ), 0 )]
+            left = x + r - d
+            right = x + w - r + d # last x + 1
+            if hollow and y < row < y + h - 1:
+                # Outline only: remove the inside, a rectangle inset by 1 with radius r - 1
+                ri = max( r - 1, 0 )
+                d = inner[max( y + 1 + ri - row, row - ( y + h - 2 - ri ), 0 )]
+                hole0 = x + 1 + ri - d
+                hole1 = x + w - 1 - ri + d
+                spans.extend( ( row, row + 1, left, hole0, row, row + 1, hole1, right ) )
+            else:
+                spans.extend( ( row, row + 1, left, right ) )
+        self._fill_spans( spans, len( spans ) >> 2, PATTERN_SOLID if c else _PATTERN_CLEAR, FILL_OPAQUE )
+        
+    @micropython.viper
+    def _fill_spans( self, spans, count:int, pattern, mode:int ):
+        """ Fill horizontal spans with an 8x8 pattern inside the clip rectangle,
+        whole bytes at a time with edge masks computed once per span
+        Args
+        spans (array): 'h' entries of first row, last row + 1, first x, last x + 1
+        count (int): Number of spans
+        pattern (bytes): 8 rows of 8 pixels, MSB left
+        mode (int): FILL_OPAQUE: pattern 0 bits are cleared, FILL_OR: only 1 bits are set,
+                    FILL_XOR: pixels under 1 bits are inverted
+        """
+        buf = ptr8( self.buffer )
+        rev = ptr8( _REV8 )
+        pat = ptr8( pattern )
+        span = ptr16( spans )
+        hmsb = int( self._rotation ) == 1
+        clip = ptr16( self._clip )
+        left   = int( clip[0] )
+        top    = int( clip[1] )
+        right  = int( clip[2] )
+        bottom = int( clip[3] )
+        
+        for i in range( count ):
+            # Signed 16-bit values
+            y0 = ( span[i * 4] ^ 0x8000 ) - 0x8000
+            y1 = ( span[i * 4 + 1] ^ 0x8000 ) - 0x8000
+            x0 = ( span[i * 4 + 2] ^ 0x8000 ) - 0x8000
+            x1 = ( span[i * 4 + 3] ^ 0x8000 ) - 0x8000
+            if x0 < left:
+                x0 = left
+            if x1 > right:
+                x1 = right
+            if y0 < top:
+                y0 = top
+            if y1 > bottom:
+                y1 = bottom
+            if x0 >= x1 or y0 >= y1:
+                continue
+            
+            col0 = x0 >> 3
+            col1 = ( x1 - 1 ) >> 3
+            lmask = 0xFF >> ( x0 & 7 )
+            rmask = ( 0xFF << ( 7 - ( ( x1 - 1 ) & 7 ) ) ) & 0xFF
+            if col0 == col1:
+                lmask = lmask & rmask
+            if hmsb:
+                lmask = rev[lmask]
+                rmask = rev[rmask]
+                
+            for y in range( y0, y1 ):
+                bits = pat[y & 7]
+                if hmsb:
+                    bits = rev[bits]
+                addr = y * LCD_COLUMNS + col0
+                last = y * LCD_COLUMNS + col1
+                
+                # Left edge byte, whole bytes, right edge byte
+                mask = lmask
+                while addr <= last:
+                    if addr == last:
+                        mask = mask & rmask
+                    if mode == FILL_XOR:
+                        buf[addr] = buf[addr] ^ ( bits & mask )
+                    elif mode == FILL_OPAQUE:
+                        buf[addr] = ( buf[addr] & ( mask ^ 0xFF ) ) | ( bits & mask )
+                    else:
+                        buf[addr] = buf[addr] | ( bits & mask )
+                    mask = 0xFF
+                    addr += 1
+
+    def xor_rect( self, x, y, w, h, f = True ):
+        """ Invert the pixels of a rectangle or of its outline and mark them dirty,
+        the same call again restores them
+        Args
+        x, y, w, h (int): Rectangle
+        f (bool): Filled, else the outline only ( every pixel inverted once )
+        """
+        if w < 1 or h < 1:
+            return
+        if f or w < 3 or h < 3:
+            spans = array( 'h', [y, y + h, x, x + w] )
+        else:
+            spans = array( 'h', [y, y + 1, x, x + w, y + h - 1, y + h, x, x + w,
+                                 y + 1, y + h - 1, x, x + 1, y + 1, y + h - 1, x + w - 1, x + w] )
+        self._fill_spans( spans, len( spans ) >> 2, PATTERN_SOLID, FILL_XOR )
+        self.mark_dirty( x, y, w, h )
+        
+    def xor_hline( self, x, y, w ):
+        """ Invert the pixels of a horizontal line and mark them dirty, the same call again restores them
+        Args
+        x (int): Start X position
+        y (int): Y position
+        w (int): Width
+        """
+        self.xor_rect( x, y, w, 1 )
+        
+    def scroll_region( self, x, y, w, h, dx, dy, c = 0 ):
+        """ Scroll the pixels of a window inside the FrameBuffer and mark it dirty
+        Rows are moved byte by byte, any dx is a whole byte move plus a bit shift.
+        Only the window ( inside the clip rectangle ) is changed
+        Args
+        x, y, w, h (int): Window
+        dx (int): Pixels to the right, negative: to the left
+        dy (int): Pixels down, negative: up
+        c (int): Color of the pixels uncovered by the move, None: keep the old pixels
+        Return (tuple): Changed area ( x, y, w, h ), None if the window is outside the clip
+        """
+        clip = self._clip
+        x0 = max( x, clip[0] )
+        y0 = max( y, clip[1] )
+        x1 = min( x + w, clip[2] )
+        y1 = min( y + h, clip[3] )
+        if x0 >= x1 or y0 >= y1:
+            return None
+        
+        if abs( dx ) < x1 - x0 and abs( dy ) < y1 - y0 and ( dx or dy ):
+            self._scroll_bits( x0, y0, x1, y1, dx, dy )
+        if c is not None and ( dx or dy ):
+            # Uncovered rows, then the uncovered columns of the other rows
+            spans = array( 'h' )
+            row0 = y0
+            row1 = y1
+            if dy > 0:
+                row0 = min( y0 + dy, y1 )
+                spans.extend( ( y0, row0, x0, x1 ) )
+            elif dy < 0:
+                row1 = max( y1 + dy, y0 )
+                spans.extend( ( row1, y1, x0, x1 ) )
+            if dx > 0:
+                spans.extend( ( row0, row1, x0, min( x0 + dx, x1 ) ) )
+            elif dx < 0:
+                spans.extend( ( row0, row1, max( x1 + dx, x0 ), x1 ) )
+            self._fill_spans( spans, len( spans ) >> 2, PATTERN_SOLID if c else _PATTERN_CLEAR, FILL_OPAQUE )
+            
+        self.mark_dirty( x0, y0, x1 - x0, y1 - y0 )
+        return ( x0, y0, x1 - x0, y1 - y0 )
+        
+    @micropython.viper
+    def _scroll_bits( self, x0:int, y0:int, x1:int, y1:int, dx:int, dy:int ):
+        """ Move the pixels of a window by dx, dy: a memmove of rows with a bit shift,
+        in the order that reads every source byte before it is overwritten.
+        Only pixels of the window are read, the uncovered band keeps its pixels
+        Args
+        x0, y0 (int): Window start
+        x1, y1 (int): Window end + 1
+        dx, dy (int): Move, smaller than the window
+        """
+        buf = ptr8( self.buffer )
+        rev = ptr8( _REV8 )
+        hmsb = int( self._rotation ) == 1
+        
+        # Destination columns with a source column in the window,
+        # the uncovered ones are left to the caller
+        left = x0
+        right = x1
+        if dx > 0:
+            left = x0 + dx
+        else:
+            right = x1 + dx
+        col0 = left >> 3
+        col1 = ( right - 1 ) >> 3
+        lmask = 0xFF >> ( left & 7 )
+        rmask = ( 0xFF << ( 7 - ( ( right - 1 ) & 7 ) ) ) & 0xFF
+        if col0 == col1:
+            lmask = lmask & rmask
+            rmask = lmask
+            
+        # Rows with a source row in the window, bottom up when moving down
+        if dy > 0:
+            row = y1 - 1
+            end = y0 + dy - 1
+            row_step = -1
+        else:
+            row = y0
+            end = y1 + dy
+            row_step = 1
+        # Bytes right to left when moving right
+        if dx > 0:
+            first = col1
+            last = col0 - 1
+            step = -1
+        else:
+            first = col0
+            last = col1 + 1
+            step = 1
+        shift = 8 - ( ( 0 - dx ) & 7 ) # source bit offset 0 takes the whole left byte
+        
+        while row != end:
+            src = ( row - dy ) * LCD_COLUMNS
+            dest = row * LCD_COLUMNS
+            j = first
+            while j != last:
+                # 8 source pixels from two bytes: left one high, right one low
+                b = ( ( j << 3 ) - dx ) >> 3
+                high = 0
+                low = 0
+                if b >= 0 and b < LCD_COLUMNS:
+                    high = buf[src + b]
+                    if hmsb:
+                        high = rev[high]
+                if b + 1 >= 0 and b + 1 < LCD_COLUMNS:
+                    low = buf[src + b + 1]
+                    if hmsb:
+                        low = rev[low]
+                value = ( ( ( high << 8 ) | low ) >> shift ) & 0xFF
+                
+                mask = 0xFF
+                if j == col0:
+                    mask = lmask
+                elif j == col1:
+                    mask = rmask
+                byte = buf[dest + j]
+                if hmsb:
+                    byte = rev[byte]
+                byte = ( byte & ( mask ^ 0xFF ) ) | ( value & mask )
+                if hmsb:
+                    byte = rev[byte]
+                buf[dest + j] = byte
+                j += step
+            row += row_step
+
+    def draw_gauge( self, gauge ):
+        """ Draw the face of a gauge: scale arc, ticks, axis and needle,
+        and mark the gauge dirty
+        Args
+        gauge (Gauge): Gauge
+        """
+        color  = gauge.color
+        radius = gauge.radius
+        start  = gauge.start
+        sweep  = gauge.sweep
+        
+        # Remove the needle already drawn, it is not part of the face
+        if gauge._angle is not None:
+            if gauge.mode == GAUGE_FACE:
+                self._restore_face( gauge, *gauge.box )
+            else:
+                self._xor_line( *gauge._ends )
+            gauge._angle = None
+            
+        # Scale arc in chords of 5 degrees
+        step = 5 if sweep > 0 else -5
+        x0, y0 = gauge.point( start, radius )
+        for angle in list( range( start + step, start + sweep, step ) ) + [start + sweep]:
+            x1, y1 = gauge.point( angle, radius )
+            self.line( x0, y0, x1, y1, color )
+            x0, y0 = x1, y1
+            
+        ticks = gauge.ticks
+        for i in range( ticks + 1 if ticks else 0 ):
+            angle = start + sweep * i // ticks
+            x0, y0 = gauge.point( angle, radius - gauge.tick )
+            x1, y1 = gauge.point( angle, radius )
+            self.line( x0, y0, x1, y1, color )
+        self.ellipse( gauge.cx, gauge.cy, gauge.hub, gauge.hub, color, True )
+        
+        x = gauge.cx - radius
+        y = gauge.cy - radius
+        size = radius * 2 + 1
+        if gauge.mode == GAUGE_FACE:
+            self._save_face( gauge, x, y, size, size )
+        self._draw_needle( gauge, gauge.angle( gauge.value ) )
+        self.mark_dirty( x, y, size, size )
+        
+    def set_needle( self, gauge, value ):
+        """ Move the needle of a gauge drawn by draw_gauge: only the old needle
+        is erased, the old and new needle areas are marked dirty
+        Args
+        gauge (Gauge): Gauge
+        value (number): New value
+        Return (tuple): Changed area ( x, y, w, h ) for show_rect, None if the needle did not move
+        """
+        gauge.value = value
+        angle = gauge.angle( value )
+        if angle == gauge._angle:
+            return None
+        
+        old = gauge.box
+        if gauge._angle is not None:
+            if gauge.mode == GAUGE_FACE:
+                self._restore_face( gauge, *old )
+            else:
+                self._xor_line( *gauge._ends )
+        new = self._draw_needle( gauge, angle )
+        
+        self.mark_dirty( *new )
+        if old is None:
+            return new
+        self.mark_dirty( *old )
+        x = min( old[0], new[0] )
+        y = min( old[1], new[1] )
+        return ( x, y, max( old[0] + old[2], new[0] + new[2] ) - x, max( old[1] + old[3], new[1] + new[3] ) - y )
+    
+    def _draw_needle( self, gauge, angle ):
+        """ Draw the needle of a gauge at an angle
+        Return (tuple): Needle area ( x, y, w, h )
+        """
+        x0, y0 = gauge.point( angle, gauge.hub + 1 )
+        x1, y1 = gauge.point( angle, gauge.radius - gauge.tick - 1 )
+        if gauge.mode == GAUGE_FACE:
+            self.line( x0, y0, x1, y1, gauge.color )
+        else:
+            self._xor_line( x0, y0, x1, y1 )
+        gauge._angle = angle
+        gauge._ends = ( x0, y0, x1, y1 )
+        gauge.box = ( min( x0, x1 ), min( y0, y1 ), abs( x1 - x0 ) + 1, abs( y1 - y0 ) + 1 )
+        return gauge.box
+    
+    def _save_face( self, gauge, x, y, w, h ):
+        """ Copy the framebuffer bytes of a gauge face """
+        col0 = max( x, 0 ) >> 3
+        col1 = ( min( x + w, LCD_WIDTH ) + 7 ) >> 3
+        row0 = max( y, 0 )
+        row1 = min( y + h, LCD_HEIGHT )
+        if col0 >= col1 or row0 >= row1:
+            gauge._face = None
+            return
+        
+        count = col1 - col0
+        data = bytearray( count * ( row1 - row0 ) )
+        buffer = memoryview( self.buffer )
+        pos = 0
+        for row in range( row0, row1 ):
+            start = row * LCD_COLUMNS + col0
+            data[pos : pos + count] = buffer[start : start + count]
+            pos += count
+        gauge._face = ( data, col0, row0, count )
+        
+    def _restore_face( self, gauge, x, y, w, h ):
+        """ Copy the saved face bytes of a gauge back into a rectangle """
+        if gauge._face is None:
+            return
+        data, col0, row0, count = gauge._face
+        col1 = min( ( x + w + 7 ) >> 3, col0 + count )
+        row1 = min( y + h, row0 + len( data ) // count )
+        first = max( x >> 3, col0 )
+        buffer = memoryview( self.buffer )
+        for row in range( max( y, row0 ), row1 ):
+            pos = ( row - row0 ) * count + first - col0
+            start = row * LCD_COLUMNS + first
+            buffer[start : start + col1 - first] = data[pos : pos + col1 - first]
+    
+    @micropython.viper
+    def _xor_line( self, x0:int, y0:int, x1:int, y1:int ):
+        """ Invert the pixels of a line inside the clip rectangle,
+        inverting the same line again restores them
+        Args
+        x0, y0 (int): Start point
+        x1, y1 (int): End point
+        """
+        buf = ptr8( self.buffer )
+        hmsb = int( self._rotation ) == 1
+        clip = ptr16( self._clip )
+        left   = int( clip[0] )
+        top    = int( clip[1] )
+        right  = int( clip[2] )
+        bottom = int( clip[3] )
+        
+        dx = x1 - x0
+        sx = 1
+        if dx < 0:
+            dx = 0 - dx
+            sx = -1
+        dy = y1 - y0
+        sy = 1
+        if dy < 0:
+            dy = 0 - dy
+            sy = -1
+        err = dx - dy
+        
+        while True:
+            if x0 >= left and x0 < right and y0 >= top and y0 < bottom:
+                if hmsb:
+                    bit = 1 << ( x0 & 7 )
+                else:
+                    bit = 0x80 >> ( x0 & 7 )
+                i = y0 * LCD_COLUMNS + ( x0 >> 3 )
+                buf[i] = buf[i] ^ bit
+            if x0 == x1 and y0 == y1:
+                break
+            e2 = err << 1
+            if e2 > 0 - dy:
+                err -= dy
+                x0 += sx
+            if e2 < dx:
+                err += dx
+                y0 += sy
+
+    @micropython.viper
+    def _clip_line( self, x0:int, y0:int, x1:int, y1:int, c:int ):
+        """ Line inside the clip rectangle, same pixels as FrameBuffer.line
+        Args
+        x0, y0 (int): Start point
+        x1, y1 (int): End point
+        c (int): Color 0 or 1
+        """
+        buf = ptr8( self.buffer )
+        hmsb = int( self._rotation ) == 1
+        clip = ptr16( self._clip )
+        left   = int( clip[0] )
+        top    = int( clip[1] )
+        right  = int( clip[2] )
+        bottom = int( clip[3] )
+        
+        # Bresenham steps of modframebuf.c, the end point is drawn last
+        dx = x1 - x0
+        sx = 1
+        if dx <= 0:
+            dx = 0 - dx
+            sx = -1
+        dy = y1 - y0
+        sy = 1
+        if dy <= 0:
+            dy = 0 - dy
+            sy = -1
+        steep = dy > dx
+        if steep:
+            t = x0
+            x0 = y0
+            y0 = t
+            t = dx
+            dx = dy
+            dy = t
+            t = sx
+            sx = sy
+            sy = t
+        e = ( dy << 1 ) - dx
         
         i = 0
-        for h in range(height):
-            bit_len = 0
-            while bit_len < width:
-                byte = data[i]
-                xpos = bit_len + x
-                ypos = h + y                
-                #Drawing pixels when bit = 1
-                if (byte >> 7) & 1:
-                    self.pixel(xpos    , ypos, color)
-                if (byte >> 6) & 1:
-                    self.pixel(xpos + 1, ypos, color)
-                if (byte >> 5) & 1:
-                    self.pixel(xpos + 2, ypos, color)
-                if (byte >> 4) & 1:
-                    self.pixel(xpos + 3, ypos, color)
-                if (byte >> 3) & 1:
-                    self.pixel(xpos + 4, ypos, color)
-                if (byte >> 2) & 1:
-                    self.pixel(xpos + 5, ypos, color)
-                if (byte >> 1) & 1:
-                    self.pixel(xpos + 6, ypos, color)
-                if byte & 1:
-                    self.pixel(xpos + 7, ypos, color)
-
-                bit_len += 8
-                i += 1
+        while i <= dx:
+            if i == dx:
+                px = x1
+                py = y1
+            elif steep:
+                px = y0
+                py = x0
+            else:
+                px = x0
+                py = y0
+            if px >= left and px < right and py >= top and py < bottom:
+                if hmsb:
+                    bit = 1 << ( px & 7 )
+                else:
+                    bit = 0x80 >> ( px & 7 )
+                k = py * LCD_COLUMNS + ( px >> 3 )
+                if c:
+                    buf[k] = buf[k] | bit
+                else:
+                    buf[k] = buf[k] & ( bit ^ 0xFF )
+            if i < dx:
+                while e >= 0:
+                    y0 += sy
+                    e -= dx << 1
+                x0 += sx
+                e += dy << 1
+            i += 1
 
-    def load_bmp( self, filename, x = 0, y = 0, color = 1 ):
-        """ Load monochromatic BMP image on framebuffer
+    def load_bmp( self, filename, x = 0, y = 0, color = 1, dither = DITHER_FS ):
+        """ Load monochromatic or 8-bit grayscale BMP image on framebuffer
         Args
         filename (string): filename of image, example: "rain.bmp"
         x (int) : Start X position
         y (int) : Start Y position
         color  (int): Color 0 or 1
+        dither (int): Grayscale images: DITHER_BAYER or DITHER_FS
         """
         f = open(filename, 'rb')
 
-        if f.read(2) == b'BM':  #header
-            dummy    = f.read(8)
-            offset   = int.from_bytes(f.read(4), 'little')
-            dummy    = f.read(4) #hdrsize
-            width    = int.from_bytes(f.read(4), 'little')
-            height   = int.from_bytes(f.read(4), 'little')
-            planes   = int.from_bytes(f.read(2), 'little')
-            depth    = int.from_bytes(f.read(2), 'little')
-            compress = int.from_bytes(f.read(4), 'little')
-
-            if planes == 1 and depth == 1 and compress == 0: #compress method == uncompressed
-                f.seek(offset)
-                
-                self._send_bmp_to_buffer( f, x, y, width, height, color)
-            else:
-                print("Unsupported planes, depth, compress:", planes, depth, compress )
+        header = self._read_bmp_header( f )
+        if header:
+            offset, width, height, gray = header
+            self._send_bmp_to_buffer( f, offset, x, y, width, height, color, gray, dither )
                 
         f.close()    
         
-    @micropython.viper
-    def _send_bmp_to_buffer( self, f, x:int, y:int, width:int, height:int, color:int):
-        """ Send bmp-file to buffer
+    def _read_bmp_header( self, f ):
+        """ Parse header of a BMP file
+        Args
+        f (object File) : Image file
+        Return (tuple): offset, width, height ( negative for top-down images ),
+        gray levels of the palette for 8-bit images or None; None if unsupported
+        """
+        if f.read(2) != b'BM':  #header
+            return None
+        
+        dummy    = f.read(8)
+        offset   = int.from_bytes(f.read(4), 'little')
+        hdrsize  = int.from_bytes(f.read(4), 'little')
+        width    = int.from_bytes(f.read(4), 'little')
+        height   = int.from_bytes(f.read(4), 'little')
+        if height & 0x80000000: # negative height: top-down image
+            height -= 0x100000000
+        planes   = int.from_bytes(f.read(2), 'little')
+        depth    = int.from_bytes(f.read(2), 'little')
+        compress = int.from_bytes(f.read(4), 'little')
+
+        if planes == 1 and depth == 1 and compress == 0: #compress method == uncompressed
+            return offset, width, height, None
+        
+        if planes == 1 and depth == 8 and compress == 0:
+            # Palette to gray levels
+            f.seek( 46 )
+            colors = int.from_bytes(f.read(4), 'little') or 256
+            f.seek( 14 + hdrsize )
+            palette = f.read( colors * 4 )
+            gray = bytearray( 256 )
+            for i in range( colors ):
+                b, g, r = palette[i * 4], palette[i * 4 + 1], palette[i * 4 + 2]
+                gray[i] = ( r * 77 + g * 150 + b * 29 ) >> 8
+            return offset, width, height, gray
+        
+        print("Unsupported planes, depth, compress:", planes, depth, compress )
+        return None
+    
+    def _decode_image( self, filename, dither ):
+        """ Read a whole BMP or raw image into a bitmap, pixels of color are 1
+        Args
+        filename (string): filename of image
+        dither (int): Grayscale images: DITHER_BAYER or DITHER_FS
+        Return (tuple): Bitmap ( data, height, width ), None if unsupported
+        """
+        f = open(filename, 'rb')
+        
+        bitmap = None
+        header = f.read(6)
+        if header[:2] == b'R1':
+            width  = header[2] | ( header[3] << 8 )
+            height = header[4] | ( header[5] << 8 )
+            data = bytearray( ( ( width + 7 ) >> 3 ) * height )
+            f.readinto( data )
+            bitmap = ( data, height, width )
+        else:
+            f.seek( 0 )
+            header = self._read_bmp_header( f )
+            if header:
+                offset, width, height, gray = header
+                top_down = height < 0
+                height = abs( height )
+                stride = ( width + 7 ) >> 3
+                depth = 8 if gray else 1
+                row = self._row_buffer( ( ( width * depth + 31 ) // 32 ) * 4 )
+                data = bytearray( stride * height )
+                if gray:
+                    error = array( 'i', bytes( 4 * width ) )
+                    
+                f.seek( offset )
+                for i in range( height ):
+                    ypos = i if top_down else height - 1 - i
+                    line = memoryview( data )[ypos * stride : ( ypos + 1 ) * stride]
+                    f.readinto( row )
+                    if gray:
+                        self._dither_row( row, gray, line, width, error, 0, ypos, dither )
+                    else:
+                        for j in range( stride ): # BMP bit 1 is light
+                            line[j] = row[j] ^ 0xFF
+                bitmap = ( data, height, width )
+                
+        f.close()
+        return bitmap
+        
+    def _row_buffer(self, size):
+        """ Reusable row buffer for image loading
+        Args
+        size (int): Bytes needed
+        Return (memoryview): Buffer of the requested size
+        """
+        if len( self._row_buf ) < size:
+            self._row_buf = bytearray( size )
+        return memoryview( self._row_buf )[:size]
+
+    def _send_bmp_to_buffer( self, f, offset, x, y, width, height, color, gray = None, dither = DITHER_FS ):
+        """ Stream bmp-file to buffer row by row
         Args
         f (object File) : Image file
+        offset (int): Offset of pixel data in file
         x (int) : Start X position
         y (int) : Start Y position        
         width (int): Width of image frame
-        height (int): Height of image frame
+        height (int): Height of image frame, negative for top-down images
         color  (int): Color 0 or 1
+        gray   (bytearray): 8-bit images: gray level of every palette index
+        dither (int): 8-bit images: DITHER_BAYER or DITHER_FS
         """        
-        block_size = ((width + 31) // 32) * 4
-        bitmap_size = height * width // 8
+        depth = 8 if gray else 1
+        block_size = ((width * depth + 31) // 32) * 4 # row with padding
+        top_down = height < 0
+        height = abs( height )
+        
+        # Screen rows inside the clip rectangle
+        clip  = self._clip
+        first = max( y, clip[1] )
+        last  = min( y + height, clip[3] )
+        if first >= last or x >= clip[2] or x + width <= clip[0]:
+            return
+        
+        if top_down:
+            start = first - y
+            ypos  = first
+            step  = 1
+        else: # bottom-up: last screen row comes first
+            start = y + height - last
+            ypos  = last - 1
+            step  = -1
+        
+        row = self._row_buffer( block_size )
+        mode = ( color ^ 1 ) | BLIT_OPAQUE # color = 1: invert
+        if gray:
+            # Grayscale rows are dithered to 1-bit one by one, dark pixels are 1
+            stride = ( width + 7 ) >> 3
+            bits = bytearray( stride )
+            error = array( 'i', bytes( 4 * width ) )
+            mode = color | BLIT_OPAQUE
+        f.seek( offset + start * block_size )
+        for _ in range( last - first ):
+            f.readinto( row )
+            if gray:
+                self._dither_row( row, gray, bits, width, error, x, ypos, dither )
+                self._blit_bits( bits, 0, stride, width, 1, x, ypos, mode )
+            else:
+                self._blit_bits( row, 0, block_size, width, 1, x, ypos, mode )
+            ypos += step
+            
+    @micropython.viper
+    def _dither_row( self, data, gray, bits, width:int, error, x:int, y:int, dither:int ):
+        """ Dither one row of 8-bit palette indexes to 1-bit, dark pixels are 1
+        Args
+        data   (bytearray): Palette indexes
+        gray   (bytearray): Gray level of every palette index
+        bits   (bytearray): Output row, MONO_HLSB
+        width  (int): Width in pixels
+        error  (array): Floyd-Steinberg errors for this row, updated for the next one
+        x      (int): Screen X position, aligns the Bayer matrix
+        y      (int): Screen Y position
+        dither (int): DITHER_BAYER or DITHER_FS
+        """
+        src = ptr8( data )
+        lut = ptr8( gray )
+        out = ptr8( bits )
+        err = ptr32( error )
+        bayer = ptr8( _BAYER4 )
+        line = ( y & 3 ) << 2
+        
+        for i in range( ( width + 7 ) >> 3 ):
+            out[i] = 0
+        
+        right = 0 # error going to the next pixel
+        below = 0 # error for the pixel under the previous one
+        under = 0 # error for the pixel under this one
+        for i in range( width ):
+            level = lut[src[i]]
+            if dither == DITHER_BAYER:
+                dark = level * 16 < bayer[line + ( ( x + i ) & 3 )] * 255 + 128
+            else:
+                level += err[i] + right
+                dark = level < 128
+                if not dark:
+                    level -= 255
+                # level is now the quantization error: 7/16 right, 3/16 below
+                # left, 5/16 below, 1/16 below right
+                right = ( level * 7 ) >> 4
+                if i:
+                    err[i - 1] = below + ( ( level * 3 ) >> 4 )
+                below = under + ( ( level * 5 ) >> 4 )
+                under = level >> 4
+            if dark:
+                out[i >> 3] |= 0x80 >> ( i & 7 )
+                
+        if dither != DITHER_BAYER:
+            err[width - 1] = below
+            
+
+    def load_raw( self, filename, x = 0, y = 0 ):
+        """ Load raw image on framebuffer ( made by tools/img_to_lcd.py )
+        Rows are stored in framebuffer layout, a full screen image is loaded
+        with one readinto
+        Args
+        filename (string): filename of image, example: "splash.raw"
+        x (int) : Start X position
+        y (int) : Start Y position
+        """
+        f = open(filename, 'rb')
+        
+        header = f.read(6)
+        if header[:2] == b'R1':
+            width  = header[2] | ( header[3] << 8 )
+            height = header[4] | ( header[5] << 8 )
+            self._send_raw_to_buffer( f, 6, x, y, width, height )
+        else:
+            print("Unsupported raw image:", header[:2])
+            
+        f.close()
+        
+    def _send_raw_to_buffer( self, f, offset, x, y, width, height ):
+        """ Read raw image rows to buffer
+        Args
+        f (object File) : Image file
+        offset (int): Offset of pixel data in file
+        x (int) : Start X position
+        y (int) : Start Y position        
+        width (int): Width of image frame
+        height (int): Height of image frame
+        """
+        stride = ( width + 7 ) >> 3
+        
+        # Screen rows inside the clip rectangle
+        clip  = self._clip
+        first = max( y, clip[1] )
+        last  = min( y + height, clip[3] )
+        if first >= last or x >= clip[2] or x + width <= clip[0]:
+            return
+        
+        f.seek( offset + ( first - y ) * stride )
+        hmsb = self._rotation == 1
+        
+        if x & 7 or width & 7 or x < clip[0] or x + width > clip[2]:
+            # Unaligned or clipped: through the row buffer
+            row = self._row_buffer( stride )
+            for ypos in range( first, last ):
+                f.readinto( row )
+                self._blit_bits( row, 0, stride, width, 1, x, ypos, 1 | BLIT_OPAQUE )
+            return
+        
+        buffer = memoryview( self.buffer )
+        if width == LCD_WIDTH: # whole screen rows: one read
+            start = first * LCD_COLUMNS
+            count = ( last - first ) * LCD_COLUMNS
+            f.readinto( buffer[start : start + count] )
+            if hmsb:
+                self._reverse_bits( start, count )
+        else:
+            for ypos in range( first, last ):
+                start = ypos * LCD_COLUMNS + ( x >> 3 )
+                f.readinto( buffer[start : start + stride] )
+                if hmsb:
+                    self._reverse_bits( start, stride )
+                    
+    def load_rle( self, filename, x = 0, y = 0 ):
+        """ Load compressed image on framebuffer ( made by tools/img_to_lcd.py -c )
+        The file is decoded through a small fixed window, the whole image is
+        never held in RAM
+        Args
+        filename (string): filename of image, example: "splash.rle"
+        x (int) : Start X position
+        y (int) : Start Y position
+        Return (tuple): Changed area ( x, y, w, h ) for show_rect, None if nothing changed
+        """
+        f = open(filename, 'rb')
+        
+        area = None
+        header = f.read(6)
+        if header[:2] == b'C1':
+            width  = header[2] | ( header[3] << 8 )
+            height = header[4] | ( header[5] << 8 )
+            area = self._send_rle_to_buffer( f, x, y, width, height )
+        else:
+            print("Unsupported compressed image:", header[:2])
+            
+        f.close()
+        return area
         
-        bitmap = bytearray(bitmap_size)
-        bitmap_buffer = ptr8(bitmap)
+    def _send_rle_to_buffer( self, f, x, y, width, height ):
+        """ Decode compressed image file to buffer window by window
+        Args
+        f (object File) : Image file, positioned at the compressed data
+        x (int) : Start X position
+        y (int) : Start Y position        
+        width (int): Width of image frame
+        height (int): Height of image frame
+        Return (tuple): Changed area ( x, y, w, h ), None if nothing changed
+        """
+        # Part of the image inside the clip rectangle
+        clip = self._clip
+        col0 = max( clip[0] - x, 0 )
+        row0 = max( clip[1] - y, 0 )
+        col1 = min( clip[2] - x, width )
+        row1 = min( clip[3] - y, height )
+        if col0 >= col1 or row0 >= row1:
+            return None
+        
+        # literal, repeat, pending repeat, value, column, row, stride,
+        # visible part, first and last + 1 changed rows
+        state = array( 'i', ( 0, 0, 0, 0, 0, 0, ( width + 7 ) >> 3,
+                              col0, row0, col1, row1, 0xFFFF, 0 ) )
+        window = self._row_buffer( RLE_WINDOW )
+        while state[5] < row1:
+            count = f.readinto( window )
+            if not count:
+                break
+            self._rle_decode( window, count, state, x, y )
+            
+        if state[12] == 0:
+            return None
+        return ( x + col0, y + state[11], col1 - col0, state[12] - state[11] )
+    
+    @micropython.viper
+    def _rle_decode( self, data, count:int, state, x:int, y:int ):
+        """ Decode a chunk of PackBits data straight into the framebuffer
+        A header byte n < 128 is followed by n + 1 literal bytes, n >= 128 by
+        one byte repeated n - 126 times. Runs may go on across rows.
+        Args
+        data  (bytes): Compressed chunk
+        count (int): Bytes in chunk
+        state (array): Decoder state kept between chunks
+        x (int) : Start X position
+        y (int) : Start Y position
+        """
+        buf = ptr8( self.buffer )
+        src = ptr8( data )
+        rev = ptr8( _REV8 )
+        st  = ptr32( state )
+        hmsb = int( self._rotation ) == 1
+        
+        lit    = st[0]
+        rep    = st[1]
+        want   = st[2]
+        value  = st[3]
+        col    = st[4]
+        row    = st[5]
+        stride = st[6]
+        col0   = st[7]
+        row0   = st[8]
+        col1   = st[9]
+        row1   = st[10]
+        first  = st[11]
+        last   = st[12]
+        
+        i = 0
+        while row < row1:
+            # Next output byte
+            if rep:
+                rep -= 1
+            elif i >= count:
+                break
+            elif want:
+                value = src[i]
+                i += 1
+                rep = want - 1
+                want = 0
+            elif lit:
+                value = src[i]
+                i += 1
+                lit -= 1
+            else:
+                n = src[i]
+                i += 1
+                if n < 128:
+                    lit = n + 1
+                else:
+                    want = n - 126
+                continue
+            
+            pos = col << 3
+            if row >= row0 and pos < col1 and pos + 8 > col0:
+                # Mask of visible pixels in this byte
+                mask = 0xFF
+                if pos < col0:
+                    mask = mask >> ( col0 - pos )
+                if pos + 8 > col1:
+                    mask = mask & ( 0xFF << ( pos + 8 - col1 ) )
+                
+                xpos  = x + pos
+                shift = xpos & 7
+                addr  = ( y + row ) * LCD_COLUMNS + ( xpos >> 3 )
+                changed = 0
+                
+                part = mask >> shift
+                if part:
+                    old = buf[addr]
+                    byte = old
+                    if hmsb:
+                        byte = rev[byte]
+                    byte = ( byte & ( part ^ 0xFF ) ) | ( ( value >> shift ) & part )
+                    if hmsb:
+                        byte = rev[byte]
+                    if byte != old:
+                        buf[addr] = byte
+                        changed = 1
+                
+                part = ( mask << ( 8 - shift ) ) & 0xFF
+                if part:
+                    old = buf[addr + 1]
+                    byte = old
+                    if hmsb:
+                        byte = rev[byte]
+                    byte = ( byte & ( part ^ 0xFF ) ) | ( ( value << ( 8 - shift ) ) & part )
+                    if hmsb:
+                        byte = rev[byte]
+                    if byte != old:
+                        buf[addr + 1] = byte
+                        changed = 1
+                        
+                if changed:
+                    if row < first:
+                        first = row
+                    last = row + 1
+            
+            col += 1
+            if col == stride:
+                col = 0
+                row += 1
+        
+        st[0]  = lit
+        st[1]  = rep
+        st[2]  = want
+        st[3]  = value
+        st[4]  = col
+        st[5]  = row
+        st[11] = first
+        st[12] = last
+                    
+    def play_anim( self, filename, loops = 1 ):
+        """ Play delta-encoded animation ( made by tools/make_anim.py )
+        Every frame only writes the changed bytes to framebuffer and sends
+        them to lcd, paced to the frame rate of the file. Start from a
+        cleared screen, or any screen for XOR animations.
+        Args
+        filename (string): filename of animation, example: "boot.anim"
+        loops (int): Times to play, 0 = forever
+        """
+        f = open(filename, 'rb')
+        
+        header = f.read(8)
+        if header[:2] != b'A1':
+            print("Unsupported animation:", header[:2])
+            f.close()
+            return
         
-        image_data = f.read(height * block_size)
-        image_buffer = ptr8(image_data)
+        count, period, xor = unpack_from( '<HHB', header, 2 )
+        deadline = ticks_ms()
+        loop = 0
+        while loops == 0 or loop < loops:
+            for frame in range( count ):
+                if frame == 0 and loop:
+                    f.seek( wrap ) # last frame -> frame 0
+                    
+                wait = ticks_diff( deadline, ticks_ms() )
+                if wait > 0:
+                    sleep_ms( wait )
+                deadline = ticks_add( deadline, period )
+                self._play_frame( f, xor )
+                
+                if frame == 0:
+                    if loop:
+                        f.seek( second )
+                    else:
+                        second = f.tell()
+                    
+            wrap = f.tell()
+            loop += 1
+            
+        f.close()
         
-        row_bytes = width // 8
-        for row in range(height): 
-            byte_offset  = bitmap_size - 1 - ( row_bytes * row )
-            block_offset = block_size * row + row_bytes - 1
-            for byte in range(row_bytes): 
-                bitmap_buffer[byte_offset - byte] = image_buffer[block_offset - byte] ^ ( 0xff * color )
+    def _play_frame( self, f, xor ):
+        """ Apply the spans of one animation frame and send them to lcd
+        Args
+        f (object File) : Animation file, positioned at the frame
+        xor (int): 1 = spans are XORed, 0 = spans replace buffer bytes
+        """
+        spans = f.read(2)
+        spans = spans[0] | ( spans[1] << 8 )
+        direct = not xor and self._rotation != 1
+        buffer = memoryview( self.buffer )
+        
+        for _ in range( spans ):
+            head = f.read(4)
+            addr   = head[0] | ( head[1] << 8 )
+            length = head[2] | ( head[3] << 8 )
+            if direct: # bytes go to framebuffer as they are
+                f.readinto( buffer[addr : addr + length] )
+            else:
+                pos = addr
+                end = addr + length
+                while pos < end:
+                    size = min( end - pos, ANIM_CHUNK )
+                    chunk = self._row_buffer( size )
+                    f.readinto( chunk )
+                    self._apply_delta( chunk, pos, size, xor )
+                    pos += size
+            self._send( addr, length )
+            
+    @micropython.viper
+    def _apply_delta( self, data, start:int, count:int, xor:int ):
+        """ Replace or XOR framebuffer bytes with MONO_HLSB data
+        Args
+        data  (bytes): Source data
+        start (int): First buffer byte
+        count (int): Number of bytes
+        xor   (int): 1 = XOR, 0 = replace
+        """
+        buf = ptr8( self.buffer )
+        src = ptr8( data )
+        rev = ptr8( _REV8 )
+        hmsb = int( self._rotation ) == 1
+        for i in range( count ):
+            byte = src[i]
+            if hmsb:
+                byte = rev[byte]
+            if xor:
+                buf[start + i] ^= byte
+            else:
+                buf[start + i] = byte
+                
+    @micropython.viper
+    def _reverse_bits( self, start:int, count:int ):
+        """ Reverse the bit order of buffer bytes ( MONO_HLSB data to MONO_HMSB )
+        Args
+        start (int): First byte
+        count (int): Number of bytes
+        """
+        buf = ptr8( self.buffer )
+        rev = ptr8( _REV8 )
+        for i in range( start, start + count ):
+            buf[i] = rev[buf[i]]
 
-        fb = FrameBuffer(bitmap, width, height, MONO_HLSB)
-        self.blit(fb, x, y)
+class LCDBus( _LCDBus ):
+    """ LCDBus of LCD240128 displays of this driver """
+    driver = LCD240128
@@ -0,0 +1,167 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Packs icons into a single atlas for lcd.draw_icon()
+# Input: a folder of images (BMP, PBM/PGM, PNG... see img_to_lcd.py) or a
+# Python module of bitmaps like for_examples/bitmaps.py
+# Output: a Python module (freeze it to keep the icons in flash) or a binary
+# file for Atlas() of the driver
+
+# Atlas layout
+# ==============================
+# index: 8 bytes per icon id, little endian
+#   4 bytes  offset of the bitmap in data
+#   2 bytes  width
+#   2 bytes  height
+# data:  MONO_HLSB bitmaps, identical icons are stored once
+#
+# Binary file: b'AT', icon count (2 bytes), index, names separated by
+# b'\n' with their length (2 bytes) in front, then data
+
+import argparse
+import importlib.util
+import os
+import struct
+import sys
+
+from img_to_lcd import read_image, to_rows
+
+ATLAS_MAGIC = b'AT'
+
+
+def icons_from_module(path):
+    """ Bitmaps defined as ( data, height, width ) in a Python module """
+    spec = importlib.util.spec_from_file_location('bitmaps', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    icons = []
+    for name, value in vars(module).items():
+        if (isinstance(value, tuple) and len(value) == 3 and
+                isinstance(value[0], (bytes, bytearray)) and
+                isinstance(value[1], int) and isinstance(value[2], int)):
+            data, height, width = value
+            icons.append((name, bytes(data), width, height))
+    return icons
+
+
+def icons_from_folder(path, invert, threshold):
+    """ Every readable image of a folder, named after the file """
+    icons = []
+    for filename in sorted(os.listdir(path)):
+        name, ext = os.path.splitext(filename)
+        if ext.upper() not in ('.BMP', '.PBM', '.PGM', '.PNG', '.GIF'):
+            continue
+        pic = read_image(os.path.join(path, filename))
+        data = b''.join(to_rows(pic, invert, threshold))
+        icons.append((name, data, pic.width, pic.height))
+    return icons
+
+
+def build_atlas(icons):
+    """ Return (data, index, names), identical bitmaps share their data """
+    data = bytearray()
+    index = bytearray()
+    names = []
+    known = {}
+    for name, bitmap, width, height in icons:
+        key = (bitmap, width, height)
+        if key not in known:
+            known[key] = len(data)
+            data += bitmap
+        index += struct.pack('<IHH', known[key], width, height)
+        names.append(name)
+    return bytes(data), bytes(index), names
+
+
+def const_name(name):
+    name = ''.join(c if c.isalnum() else '_' for c in name).upper()
+    return name if name[0].isalpha() else 'ICON_' + name
+
+
+def write_bytes(stream, varname, data):
+    stream.write('{} =\\\n'.format(varname))
+    for i in range(0, len(data), 16):
+        line = ''.join('\\x{:02x}'.format(b) for b in data[i:i + 16])
+        stream.write("b'{}'{}\n".format(line, '\\' if i + 16 < len(data) else ''))
+    if not data:
+        stream.write("b''\n")
+    stream.write('\n')
+
+
+STR_GET = """
+def get(icon):
+    # Bitmap tuple ( data, height, width ) for draw_bitmap
+    offset, width, height = unpack_from('<IHH', index, icon * 8)
+    return memoryview(data)[offset:offset + ((width + 7) // 8) * height], height, width
+"""
+
+
+def write_module(path, data, index, names):
+    with open(path, 'w', encoding='utf-8') as stream:
+        stream.write('# Code generated by bitmap_atlas.py.\n')
+        stream.write('# Cmd: {}\n'.format(' '.join(sys.argv)))
+        stream.write('from micropython import const\n')
+        stream.write('from struct import unpack_from\n\n')
+        for i, name in enumerate(names):
+            stream.write('{} = const({})\n'.format(const_name(name), i))
+        stream.write('\nnames = ({},)\n\n'.format(', '.join(repr(n) for n in names)))
+        write_bytes(stream, 'index', index)
+        write_bytes(stream, 'data', data)
+        stream.write(STR_GET)
+
+
+def write_binary(path, data, index, names):
+    text = '\n'.join(names).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(ATLAS_MAGIC + struct.pack('<H', len(names)))
+        f.write(index)
+        f.write(struct.pack('<H', len(text)))
+        f.write(text)
+        f.write(data)
+
+
+# PARSE COMMAND LINE ARGUMENTS
+
+def quit(msg):
+    print(msg)
+    sys.exit(1)
+
+DESC = """bitmap_atlas.py
+Utility to pack icons into one atlas for lcd.draw_icon().
+Sample usage:
+bitmap_atlas.py ../for_examples/bitmaps.py icons.py
+bitmap_atlas.py icons_folder/ icons.bin
+
+A .py output defines a constant for every icon id (file or variable name
+in upper case). Load a .bin output on device with Atlas("icons.bin").
+"""
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(__file__, description=DESC,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('infile', type=str, help='Folder of images or Python module of bitmaps')
+    parser.add_argument('outfile', type=str, help='Output .py module or binary file')
+
+    parser.add_argument('-i', '--invert', action='store_true',
+                        help='Images: set light pixels instead of dark ones')
+    parser.add_argument('-t', '--threshold', type=int, default=128,
+                        help='Images: gray level 0..255 below which a pixel is dark, default %(default)i')
+
+    args = parser.parse_args()
+
+    if os.path.isdir(args.infile):
+        icons = icons_from_folder(args.infile, args.invert, args.threshold)
+    elif os.path.splitext(args.infile)[1].upper() == '.PY':
+        icons = icons_from_module(args.infile)
+    else:
+        quit('Input must be a folder of images or a .py module of bitmaps')
+
+    if not icons:
+        quit('No icons found')
+
+    data, index, names = build_atlas(icons)
+    if os.path.splitext(args.outfile)[1].upper() == '.PY':
+        write_module(args.outfile, data, index, names)
+    else:
+        write_binary(args.outfile, data, index, names)
+
+    print(args.outfile, 'written successfully:', len(names), 'icons,', len(data), 'bytes of bitmaps.')
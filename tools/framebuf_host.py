@@ -0,0 +1,446 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# NumPy stand-in for the MicroPython framebuf module, used by lcd_host.py to
+# run the driver under CPython: pip install numpy
+# Only the 1-bit formats are supported. The buffer keeps MicroPython's byte
+# layout bit for bit and the primitives follow the algorithms of
+# modframebuf.c, so a screen rendered here loads unchanged on the device.
+# Pixels are read and written straight in the buffer, area primitives only
+# unpack the bytes under their rectangle.
+#
+# text() uses a copy of the built-in 8x8 font of MicroPython
+# ( font_petme128_8x8.h ). Point FRAMEBUF_FONT to that header, or call
+# load_font(path), to use the font of your MicroPython sources instead.
+
+import os
+import re
+
+import numpy as np
+
+MONO_VLSB = 0
+MONO_HLSB = 3
+MONO_HMSB = 4
+MVLSB = MONO_VLSB
+
+# font_petme128_8x8: characters 32..127, 8 columns each, bit 0 at the top
+_FONT_8X8 = bytes((
+    0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,  # 32=
+    0x00, 0x00, 0x00, 0x4f, 0x4f, 0x00, 0x00, 0x00,  # 33=!
+    0x00, 0x07, 0x07, 0x00, 0x00, 0x07, 0x07, 0x00,  # 34="
+    0x14, 0x7f, 0x7f, 0x14, 0x14, 0x7f, 0x7f, 0x14,  # 35=#
+    0x00, 0x24, 0x2e, 0x6b, 0x6b, 0x3a, 0x12, 0x00,  # 36=$
+    0x00, 0x63, 0x33, 0x18, 0x0c, 0x66, 0x63, 0x00,  # 37=%
+    0x00, 0x32, 0x7f, 0x4d, 0x4d, 0x77, 0x72, 0x50,  # 38=&
+    0x00, 0x00, 0x00, 0x04, 0x06, 0x03, 0x01, 0x00,  # 39='
+    0x00, 0x00, 0x1c, 0x3e, 0x63, 0x41, 0x00, 0x00,  # 40=(
+    0x00, 0x00, 0x41, 0x63, 0x3e, 0x1c, 0x00, 0x00,  # 41=)
+    0x08, 0x2a, 0x3e, 0x1c, 0x1c, 0x3e, 0x2a, 0x08,  # 42=*
+    0x00, 0x08, 0x08, 0x3e, 0x3e, 0x08, 0x08, 0x00,  # 43=+
+    0x00, 0x00, 0x80, 0xe0, 0x60, 0x00, 0x00, 0x00,  # 44=,
+    0x00, 0x08, 0x08, 0x08, 0x08, 0x08, 0x08, 0x00,  # 45=-
+    0x00, 0x00, 0x00, 0x60, 0x60, 0x00, 0x00, 0x00,  # 46=.
+    0x00, 0x40, 0x60, 0x30, 0x18, 0x0c, 0x06, 0x02,  # 47=/
+    0x00, 0x3e, 0x7f, 0x49, 0x45, 0x7f, 0x3e, 0x00,  # 48=0
+    0x00, 0x40, 0x44, 0x7f, 0x7f, 0x40, 0x40, 0x00,  # 49=1
+    0x00, 0x62, 0x73, 0x51, 0x49, 0x4f, 0x46, 0x00,  # 50=2
+    0x00, 0x22, 0x63, 0x49, 0x49, 0x7f, 0x36, 0x00,  # 51=3
+    0x00, 0x18, 0x18, 0x14, 0x16, 0x7f, 0x7f, 0x10,  # 52=4
+    0x00, 0x27, 0x67, 0x45, 0x45, 0x7d, 0x39, 0x00,  # 53=5
+    0x00, 0x3e, 0x7f, 0x49, 0x49, 0x7b, 0x32, 0x00,  # 54=6
+    0x00, 0x03, 0x03, 0x79, 0x7d, 0x07, 0x03, 0x00,  # 55=7
+    0x00, 0x36, 0x7f, 0x49, 0x49, 0x7f, 0x36, 0x00,  # 56=8
+    0x00, 0x26, 0x6f, 0x49, 0x49, 0x7f, 0x3e, 0x00,  # 57=9
+    0x00, 0x00, 0x00, 0x24, 0x24, 0x00, 0x00, 0x00,  # 58=:
+    0x00, 0x00, 0x80, 0xe4, 0x64, 0x00, 0x00, 0x00,  # 59=;
+    0x00, 0x08, 0x1c, 0x36, 0x63, 0x41, 0x41, 0x00,  # 60=<
+    0x00, 0x14, 0x14, 0x14, 0x14, 0x14, 0x14, 0x00,  # 61==
+    0x00, 0x41, 0x41, 0x63, 0x36, 0x1c, 0x08, 0x00,  # 62=>
+    0x00, 0x02, 0x03, 0x51, 0x59, 0x0f, 0x06, 0x00,  # 63=?
+    0x00, 0x3e, 0x7f, 0x41, 0x4d, 0x4f, 0x2e, 0x00,  # 64=@
+    0x00, 0x7c, 0x7e, 0x0b, 0x0b, 0x7e, 0x7c, 0x00,  # 65=A
+    0x00, 0x7f, 0x7f, 0x49, 0x49, 0x7f, 0x36, 0x00,  # 66=B
+    0x00, 0x3e, 0x7f, 0x41, 0x41, 0x63, 0x22, 0x00,  # 67=C
+    0x00, 0x7f, 0x7f, 0x41, 0x63, 0x3e, 0x1c, 0x00,  # 68=D
+    0x00, 0x7f, 0x7f, 0x49, 0x49, 0x41, 0x41, 0x00,  # 69=E
+    0x00, 0x7f, 0x7f, 0x09, 0x09, 0x01, 0x01, 0x00,  # 70=F
+    0x00, 0x3e, 0x7f, 0x41, 0x49, 0x7b, 0x3a, 0x00,  # 71=G
+    0x00, 0x7f, 0x7f, 0x08, 0x08, 0x7f, 0x7f, 0x00,  # 72=H
+    0x00, 0x00, 0x41, 0x7f, 0x7f, 0x41, 0x00, 0x00,  # 73=I
+    0x00, 0x20, 0x60, 0x41, 0x7f, 0x3f, 0x01, 0x00,  # 74=J
+    0x00, 0x7f, 0x7f, 0x1c, 0x36, 0x63, 0x41, 0x00,  # 75=K
+    0x00, 0x7f, 0x7f, 0x40, 0x40, 0x40, 0x40, 0x00,  # 76=L
+    0x00, 0x7f, 0x7f, 0x06, 0x0c, 0x06, 0x7f, 0x7f,  # 77=M
+    0x00, 0x7f, 0x7f, 0x0e, 0x1c, 0x7f, 0x7f, 0x00,  # 78=N
+    0x00, 0x3e, 0x7f, 0x41, 0x41, 0x7f, 0x3e, 0x00,  # 79=O
+    0x00, 0x7f, 0x7f, 0x09, 0x09, 0x0f, 0x06, 0x00,  # 80=P
+    0x00, 0x1e, 0x3f, 0x21, 0x61, 0x7f, 0x5e, 0x00,  # 81=Q
+    0x00, 0x7f, 0x7f, 0x19, 0x39, 0x6f, 0x46, 0x00,  # 82=R
+    0x00, 0x26, 0x6f, 0x49, 0x49, 0x7b, 0x32, 0x00,  # 83=S
+    0x00, 0x01, 0x01, 0x7f, 0x7f, 0x01, 0x01, 0x00,  # 84=T
+    0x00, 0x3f, 0x7f, 0x40, 0x40, 0x7f, 0x3f, 0x00,  # 85=U
+    0x00, 0x1f, 0x3f, 0x60, 0x60, 0x3f, 0x1f, 0x00,  # 86=V
+    0x00, 0x7f, 0x7f, 0x30, 0x18, 0x30, 0x7f, 0x7f,  # 87=W
+    0x00, 0x63, 0x77, 0x1c, 0x1c, 0x77, 0x63, 0x00,  # 88=X
+    0x00, 0x07, 0x0f, 0x78, 0x78, 0x0f, 0x07, 0x00,  # 89=Y
+    0x00, 0x61, 0x71, 0x59, 0x4d, 0x47, 0x43, 0x00,  # 90=Z
+    0x00, 0x00, 0x7f, 0x7f, 0x41, 0x41, 0x00, 0x00,  # 91=[
+    0x00, 0x02, 0x06, 0x0c, 0x18, 0x30, 0x60, 0x40,  # 92=\
+    0x00, 0x00, 0x41, 0x41, 0x7f, 0x7f, 0x00, 0x00,  # 93=]
+    0x00, 0x08, 0x0c, 0x06, 0x06, 0x0c, 0x08, 0x00,  # 94=^
+    0xc0, 0xc0, 0xc0, 0xc0, 0xc0, 0xc0, 0xc0, 0xc0,  # 95=_
+    0x00, 0x00, 0x01, 0x03, 0x06, 0x04, 0x00, 0x00,  # 96=`
+    0x00, 0x20, 0x74, 0x54, 0x54, 0x7c, 0x78, 0x00,  # 97=a
+    0x00, 0x7f, 0x7f, 0x44, 0x44, 0x7c, 0x38, 0x00,  # 98=b
+    0x00, 0x38, 0x7c, 0x44, 0x44, 0x6c, 0x28, 0x00,  # 99=c
+    0x00, 0x38, 0x7c, 0x44, 0x44, 0x7f, 0x7f, 0x00,  # 100=d
+    0x00, 0x38, 0x7c, 0x54, 0x54, 0x5c, 0x58, 0x00,  # 101=e
+    0x00, 0x08, 0x7e, 0x7f, 0x09, 0x03, 0x02, 0x00,  # 102=f
+    0x00, 0x98, 0xbc, 0xa4, 0xa4, 0xfc, 0x7c, 0x00,  # 103=g
+    0x00, 0x7f, 0x7f, 0x04, 0x04, 0x7c, 0x78, 0x00,  # 104=h
+    0x00, 0x00, 0x00, 0x7d, 0x7d, 0x00, 0x00, 0x00,  # 105=i
+    0x00, 0x40, 0xc0, 0x80, 0x80, 0xfd, 0x7d, 0x00,  # 106=j
+    0x00, 0x7f, 0x7f, 0x30, 0x38, 0x6c, 0x44, 0x00,  # 107=k
+    0x00, 0x00, 0x41, 0x7f, 0x7f, 0x40, 0x00, 0x00,  # 108=l
+    0x00, 0x7c, 0x7c, 0x0c, 0x18, 0x0c, 0x7c, 0x78,  # 109=m
+    0x00, 0x7c, 0x7c, 0x04, 0x04, 0x7c, 0x78, 0x00,  # 110=n
+    0x00, 0x38, 0x7c, 0x44, 0x44, 0x7c, 0x38, 0x00,  # 111=o
+    0x00, 0xfc, 0xfc, 0x24, 0x24, 0x3c, 0x18, 0x00,  # 112=p
+    0x00, 0x18, 0x3c, 0x24, 0x24, 0xfc, 0xfc, 0x00,  # 113=q
+    0x00, 0x7c, 0x7c, 0x04, 0x04, 0x0c, 0x08, 0x00,  # 114=r
+    0x00, 0x48, 0x5c, 0x54, 0x54, 0x74, 0x24, 0x00,  # 115=s
+    0x00, 0x04, 0x04, 0x3e, 0x7e, 0x44, 0x44, 0x00,  # 116=t
+    0x00, 0x3c, 0x7c, 0x40, 0x40, 0x7c, 0x7c, 0x00,  # 117=u
+    0x00, 0x1c, 0x3c, 0x60, 0x60, 0x3c, 0x1c, 0x00,  # 118=v
+    0x00, 0x1c, 0x7c, 0x70, 0x38, 0x70, 0x7c, 0x1c,  # 119=w
+    0x00, 0x44, 0x6c, 0x38, 0x38, 0x6c, 0x44, 0x00,  # 120=x
+    0x00, 0x9c, 0xbc, 0xa0, 0xe0, 0x7c, 0x3c, 0x00,  # 121=y
+    0x00, 0x44, 0x64, 0x74, 0x5c, 0x4c, 0x44, 0x00,  # 122=z
+    0x00, 0x08, 0x08, 0x3e, 0x77, 0x41, 0x41, 0x00,  # 123={
+    0x00, 0x00, 0x00, 0xff, 0xff, 0x00, 0x00, 0x00,  # 124=|
+    0x00, 0x41, 0x41, 0x77, 0x3e, 0x08, 0x08, 0x00,  # 125=}
+    0x00, 0x02, 0x03, 0x01, 0x03, 0x02, 0x03, 0x01,  # 126=~
+    0xaa, 0x55, 0xaa, 0x55, 0xaa, 0x55, 0xaa, 0x55,  # 127
+))
+
+_font = _FONT_8X8
+
+
+def load_font(path):
+    """ Read the 8x8 font of FrameBuffer.text() from font_petme128_8x8.h """
+    global _font
+    with open(path) as f:
+        text = f.read()
+    values = [int(v, 16) for v in re.findall(r'0x([0-9a-fA-F]{2})\b', text)]
+    if len(values) < 96 * 8:
+        raise ValueError('Not a font_petme128_8x8.h file: {}'.format(path))
+    _font = bytes(values[:96 * 8])
+
+
+if os.environ.get('FRAMEBUF_FONT'):
+    load_font(os.environ['FRAMEBUF_FONT'])
+
+
+def _cdiv(a, b):
+    """ C integer division, truncated toward zero """
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+
+class FrameBuffer:
+    """ 1-bit FrameBuffer over a writable buffer ( bytearray, memoryview... ) """
+    def __init__(self, buffer, width, height, format, stride=None):
+        if format not in (MONO_VLSB, MONO_HLSB, MONO_HMSB):
+            raise ValueError('invalid format')
+        self._buf = buffer
+        self._mem = np.frombuffer(buffer, dtype=np.uint8)
+        self._bytes = memoryview(buffer).cast('B')
+        self._width = width
+        self._height = height
+        self._format = format
+        self._stride = (width if stride is None else stride)
+        if format == MONO_VLSB:
+            self._shape = ((height + 7) >> 3, self._stride)
+        else:
+            self._shape = (height, (self._stride + 7) >> 3)
+        if self._mem.size < self._shape[0] * self._shape[1]:
+            raise ValueError('buffer too small')
+
+    # PACKED BITS: one pixel, straight in the buffer
+
+    def _put(self, x, y, c):
+        """ Set or clear one pixel, outside of the buffer is skipped """
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return
+        if self._format == MONO_VLSB:
+            i, bit = (y >> 3) * self._shape[1] + x, 1 << (y & 7)
+        elif self._format == MONO_HLSB:
+            i, bit = y * self._shape[1] + (x >> 3), 0x80 >> (x & 7)
+        else:
+            i, bit = y * self._shape[1] + (x >> 3), 1 << (x & 7)
+        if c:
+            self._bytes[i] |= bit
+        else:
+            self._bytes[i] &= ~bit & 0xFF
+
+    # PIXEL PLANE: one byte per pixel of the bytes around a rectangle,
+    # padding bits included
+
+    def _plane(self, x0=0, y0=0, x1=None, y1=None):
+        """ Unpack the bytes holding the pixels x0..x1-1, y0..y1-1
+        Return (tuple): plane, x and y of its first pixel """
+        x1 = self._width if x1 is None else x1
+        y1 = self._height if y1 is None else y1
+        mem = self._mem[:self._shape[0] * self._shape[1]].reshape(self._shape)
+        if self._format == MONO_VLSB:
+            p0, p1 = y0 >> 3, (y1 + 7) >> 3
+            bits = np.unpackbits(mem[p0:p1, np.newaxis, x0:x1], axis=1, bitorder='little')
+            return bits.reshape((p1 - p0) * 8, x1 - x0), x0, p0 * 8
+        c0, c1 = x0 >> 3, (x1 + 7) >> 3
+        order = 'big' if self._format == MONO_HLSB else 'little'
+        return np.unpackbits(mem[y0:y1, c0:c1], axis=1, bitorder=order), c0 * 8, y0
+
+    def _store(self, plane, ox, oy):
+        """ Pack a plane from _plane() back into its bytes """
+        mem = self._mem[:self._shape[0] * self._shape[1]].reshape(self._shape)
+        rows, cols = plane.shape
+        if self._format == MONO_VLSB:
+            pages = np.packbits(plane.reshape(rows >> 3, 8, cols), axis=1, bitorder='little')
+            mem[oy >> 3:(oy >> 3) + (rows >> 3), ox:ox + cols] = pages.reshape(rows >> 3, cols)
+        else:
+            order = 'big' if self._format == MONO_HLSB else 'little'
+            mem[oy:oy + rows, ox >> 3:(ox >> 3) + (cols >> 3)] = np.packbits(plane, axis=1, bitorder=order)
+
+    # PRIMITIVES
+
+    def fill(self, c):
+        self.fill_rect(0, 0, self._width, self._height, c)
+
+    def fill_rect(self, x, y, w, h, c):
+        if (h < 1 or w < 1 or x + w <= 0 or y + h <= 0 or
+                y >= self._height or x >= self._width):
+            return
+        x1 = min(self._width, x + w)
+        y1 = min(self._height, y + h)
+        x = max(x, 0)
+        y = max(y, 0)
+        plane, ox, oy = self._plane(x, y, x1, y1)
+        plane[y - oy:y1 - oy, x - ox:x1 - ox] = 1 if c else 0
+        self._store(plane, ox, oy)
+
+    def pixel(self, x, y, c=None):
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            return None
+        if c is not None:
+            self._put(x, y, c)
+            return None
+        if self._format == MONO_VLSB:
+            return self._bytes[(y >> 3) * self._shape[1] + x] >> (y & 7) & 1
+        byte = self._bytes[y * self._shape[1] + (x >> 3)]
+        if self._format == MONO_HLSB:
+            return byte >> (7 - (x & 7)) & 1
+        return byte >> (x & 7) & 1
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+        else:
+            self.fill_rect(x, y, w, 1, c)
+            self.fill_rect(x, y + h - 1, w, 1, c)
+            self.fill_rect(x, y, 1, h, c)
+            self.fill_rect(x + w - 1, y, 1, h, c)
+
+    def _line(self, x1, y1, x2, y2, c):
+        """ Bresenham line of modframebuf.c """
+        dx = x2 - x1
+        if dx > 0:
+            sx = 1
+        else:
+            dx, sx = -dx, -1
+        dy = y2 - y1
+        if dy > 0:
+            sy = 1
+        else:
+            dy, sy = -dy, -1
+        steep = dy > dx
+        if steep:
+            x1, y1 = y1, x1
+            dx, dy = dy, dx
+            sx, sy = sy, sx
+        e = 2 * dy - dx
+        for _ in range(dx):
+            if steep:
+                self._put(y1, x1, c)
+            else:
+                self._put(x1, y1, c)
+            while e >= 0:
+                y1 += sy
+                e -= 2 * dx
+            x1 += sx
+            e += 2 * dy
+        self._put(x2, y2, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        self._line(x1, y1, x2, y2, c)
+
+    def _hspan(self, x, y, w, c):
+        """ fill_rect( x, y, w, 1 ) """
+        if w < 1 or not 0 <= y < self._height or x + w <= 0 or x >= self._width:
+            return
+        for px in range(max(x, 0), min(self._width, x + w)):
+            self._put(px, y, c)
+
+    def ellipse(self, cx, cy, xr, yr, c, f=False, m=0x0f):
+        fill = bool(f)
+        m &= 0x0f
+
+        def points(x, y):
+            if fill:
+                if m & 1:
+                    self._hspan(cx, cy - y, x + 1, c)
+                if m & 2:
+                    self._hspan(cx - x, cy - y, x + 1, c)
+                if m & 4:
+                    self._hspan(cx - x, cy + y, x + 1, c)
+                if m & 8:
+                    self._hspan(cx, cy + y, x + 1, c)
+            else:
+                if m & 1:
+                    self._put(cx + x, cy - y, c)
+                if m & 2:
+                    self._put(cx - x, cy - y, c)
+                if m & 4:
+                    self._put(cx - x, cy + y, c)
+                if m & 8:
+                    self._put(cx + x, cy + y, c)
+
+        two_a2 = 2 * xr * xr
+        two_b2 = 2 * yr * yr
+        x, y = xr, 0
+        xchange = yr * yr * (1 - 2 * xr)
+        ychange = xr * xr
+        error = 0
+        stop_x, stop_y = two_b2 * xr, 0
+        while stop_x >= stop_y:
+            points(x, y)
+            y += 1
+            stop_y += two_a2
+            error += ychange
+            ychange += two_a2
+            if 2 * error + xchange > 0:
+                x -= 1
+                stop_x -= two_b2
+                error += xchange
+                xchange += two_b2
+        x, y = 0, yr
+        xchange = yr * yr
+        ychange = xr * xr * (1 - 2 * yr)
+        error = 0
+        stop_x, stop_y = 0, two_a2 * yr
+        while stop_x <= stop_y:
+            points(x, y)
+            x += 1
+            stop_x += two_b2
+            error += xchange
+            xchange += two_b2
+            if 2 * error + ychange > 0:
+                y -= 1
+                stop_y -= two_a2
+                error += ychange
+                ychange += two_a2
+
+    def poly(self, x, y, coords, c, f=False):
+        coords = list(coords)
+        n = len(coords) // 2
+        if n == 0:
+            return
+        if not f:
+            px, py = coords[0], coords[1]
+            for i in range(n - 1, -1, -1):
+                qx, qy = coords[i * 2], coords[i * 2 + 1]
+                self._line(x + px, y + py, x + qx, y + qy, c)
+                px, py = qx, qy
+            return
+
+        ys = coords[1::2]
+        for py in range(min(ys), max(ys) + 1):
+            nodes = []
+            px1, py1 = coords[0], coords[1]
+            for i in range(n - 1, -1, -1):
+                px2, py2 = coords[i * 2], coords[i * 2 + 1]
+                # Bottom pixel of an edge is left out, like modframebuf.c
+                if py1 != py2 and ((py1 > py and py2 <= py) or (py1 <= py and py2 > py)):
+                    node = _cdiv(32 * px1 + _cdiv(32 * (px2 - px1) * (py - py1), py2 - py1) + 16, 32)
+                    nodes.append(node)
+                elif py == max(py1, py2):
+                    # Local minima
+                    if py1 < py2:
+                        self._put(x + px2, y + py, c)
+                    elif py2 < py1:
+                        self._put(x + px1, y + py, c)
+                    else:
+                        self._line(x + px1, y + py, x + px2, y + py, c)
+                px1, py1 = px2, py2
+            nodes.sort()
+            for i in range(0, len(nodes) - 1, 2):
+                self._hspan(x + nodes[i], y + py, nodes[i + 1] - nodes[i] + 1, c)
+
+    def text(self, s, x, y, c=1):
+        for ch in str(s):
+            code = ord(ch)
+            if code < 32 or code > 127:
+                code = 127
+            glyph = _font[(code - 32) * 8:(code - 31) * 8]
+            for column in glyph:
+                if 0 <= x < self._width:
+                    for row in range(8):
+                        if column >> row & 1:
+                            self._put(x, y + row, c)
+                x += 1
+
+    def scroll(self, xstep, ystep):
+        w, h = self._width, self._height
+        if xstep < 0:
+            if w + xstep <= 0:
+                return
+            dst_x, src_x = slice(0, w + xstep), slice(-xstep, w)
+        else:
+            if xstep - 1 >= w - 1:
+                return
+            dst_x, src_x = slice(xstep, w), slice(0, w - xstep)
+        if ystep < 0:
+            if h + ystep <= 0:
+                return
+            dst_y, src_y = slice(0, h + ystep), slice(-ystep, h)
+        else:
+            if ystep - 1 >= h - 1:
+                return
+            dst_y, src_y = slice(ystep, h), slice(0, h - ystep)
+        plane, ox, oy = self._plane()
+        plane[dst_y, dst_x] = plane[src_y, src_x].copy()
+        self._store(plane, ox, oy)
+
+    def blit(self, source, x, y, key=-1, palette=None):
+        if isinstance(source, tuple):
+            source = FrameBuffer(*source)
+        if x >= self._width or y >= self._height or -x >= source._width or -y >= source._height:
+            return
+        x0, y0 = max(0, x), max(0, y)
+        x1, y1 = max(0, -x), max(0, -y)
+        x0end = min(self._width, x + source._width)
+        y0end = min(self._height, y + source._height)
+        src, sx, sy = source._plane(x1, y1, x1 + x0end - x0, y1 + y0end - y0)
+        cols = src[y1 - sy:y1 - sy + y0end - y0, x1 - sx:x1 - sx + x0end - x0].astype(np.int64)
+        if palette is not None:
+            lut = np.array([palette.pixel(i, 0) or 0 for i in range(2)], dtype=np.int64)
+            cols = lut[cols]
+        plane, ox, oy = self._plane(x0, y0, x0end, y0end)
+        area = plane[y0 - oy:y0end - oy, x0 - ox:x0end - ox]
+        keep = cols == key
+        area[:] = np.where(keep, area, cols != 0)
+        self._store(plane, ox, oy)
@@ -0,0 +1,284 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Converts images to the raw LCD240128 image format, loaded with load_raw(),
+# or to the compressed format (-c), loaded with load_rle()
+# BMP and PBM/PGM files are read directly, other formats (PNG...) need Pillow:
+# pip install pillow
+
+# Raw image format
+# ==============================
+# 0  2 bytes  b'R1'
+# 2  2 bytes  width, little endian
+# 4  2 bytes  height, little endian
+# 6  height rows of (width + 7) // 8 bytes, MONO_HLSB: MSB is the left pixel,
+#    1 = pixel on (dark). This is exactly the FrameBuffer row layout of the
+#    driver, so a 240x128 image is one readinto() of the framebuffer.
+
+# Compressed image format
+# ==============================
+# 0  2 bytes  b'C1'
+# 2  2 bytes  width, little endian
+# 4  2 bytes  height, little endian
+# 6  the raw rows above as one PackBits stream, runs go on across rows:
+#    n < 128   n + 1 literal bytes follow
+#    n >= 128  the next byte is repeated n - 126 times
+
+import argparse
+import os
+import struct
+import sys
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+RAW_MAGIC = b'R1'
+RLE_MAGIC = b'C1'
+
+
+class Picture:
+    """ Grayscale image: one byte per pixel, 0 = black, 255 = white """
+    def __init__(self, width, height, pixels=None):
+        self.width = width
+        self.height = height
+        self.pixels = pixels or bytearray(width * height)
+
+    def row(self, y):
+        return self.pixels[y * self.width:(y + 1) * self.width]
+
+
+# IMAGE READERS
+
+def read_pnm(path):
+    """ Read PBM (P1, P4) and PGM (P2, P5) files """
+    with open(path, 'rb') as f:
+        data = f.read()
+    tokens = []
+    pos = 0
+    # Header: magic, width, height [, maxval], comments start with #
+    count = 3 if data[:2] in (b'P1', b'P4') else 4
+    while len(tokens) < count:
+        while data[pos:pos + 1].isspace():
+            pos += 1
+        if data[pos:pos + 1] == b'#':
+            while data[pos:pos + 1] not in (b'\n', b''):
+                pos += 1
+            continue
+        start = pos
+        while not data[pos:pos + 1].isspace():
+            pos += 1
+        tokens.append(data[start:pos])
+    pos += 1  # single whitespace before binary data
+    magic = tokens[0]
+    width, height = int(tokens[1]), int(tokens[2])
+    pic = Picture(width, height)
+    if magic == b'P4':
+        stride = (width + 7) // 8
+        for y in range(height):
+            for x in range(width):
+                bit = data[pos + y * stride + (x >> 3)] & (0x80 >> (x & 7))
+                pic.pixels[y * width + x] = 0 if bit else 255  # 1 = black
+    elif magic == b'P1':
+        bits = [c for c in data[pos - 1:] if c in b'01']
+        for i in range(width * height):
+            pic.pixels[i] = 0 if bits[i] == ord('1') else 255
+    elif magic == b'P5':
+        maxval = int(tokens[3])
+        for i in range(width * height):
+            pic.pixels[i] = data[pos + i] * 255 // maxval
+    elif magic == b'P2':
+        maxval = int(tokens[3])
+        values = data[pos - 1:].split()
+        for i in range(width * height):
+            pic.pixels[i] = int(values[i]) * 255 // maxval
+    else:
+        quit('Unsupported PNM type: {}'.format(magic.decode()))
+    return pic
+
+
+def read_bmp(path):
+    """ Read uncompressed 1, 4, 8, 24 and 32 bit BMP files """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:2] != b'BM':
+        quit('Not a BMP file: {}'.format(path))
+    offset, hdrsize = struct.unpack_from('<II', data, 10)
+    width, height, planes, depth, compress = struct.unpack_from('<iiHHI', data, 18)
+    colors = struct.unpack_from('<I', data, 46)[0] if hdrsize >= 40 else 0
+    if planes != 1 or compress not in (0, 3) or depth not in (1, 4, 8, 24, 32):
+        quit('Unsupported BMP: planes {}, depth {}, compress {}'.format(planes, depth, compress))
+    top_down = height < 0
+    height = abs(height)
+
+    palette = []
+    if depth <= 8:
+        pos = 14 + hdrsize
+        for _ in range(colors or (1 << depth)):
+            b, g, r = data[pos], data[pos + 1], data[pos + 2]
+            palette.append((r * 299 + g * 587 + b * 114) // 1000)
+            pos += 4
+
+    stride = ((width * depth + 31) // 32) * 4
+    pic = Picture(width, height)
+    for row in range(height):
+        y = row if top_down else height - 1 - row
+        line = offset + row * stride
+        for x in range(width):
+            if depth == 1:
+                value = palette[(data[line + (x >> 3)] >> (7 - (x & 7))) & 1]
+            elif depth == 4:
+                value = palette[(data[line + (x >> 1)] >> (4 * (1 - (x & 1)))) & 15]
+            elif depth == 8:
+                value = palette[data[line + x]]
+            else:
+                pos = line + x * (depth // 8)
+                b, g, r = data[pos], data[pos + 1], data[pos + 2]
+                value = (r * 299 + g * 587 + b * 114) // 1000
+            pic.pixels[y * width + x] = value
+    return pic
+
+
+def read_pil(path):
+    """ Read any format supported by Pillow """
+    if Image is None:
+        quit('Pillow is needed to read {}: pip install pillow'.format(path))
+    img = Image.open(path).convert('L')
+    return Picture(img.width, img.height, bytearray(img.tobytes()))
+
+
+def read_image(path):
+    ext = os.path.splitext(path)[1].upper()
+    if ext in ('.PBM', '.PGM'):
+        return read_pnm(path)
+    if ext == '.BMP':
+        return read_bmp(path)
+    return read_pil(path)
+
+
+# CONVERSION
+
+BAYER4 = (0, 8, 2, 10, 12, 4, 14, 6, 3, 11, 1, 9, 15, 7, 13, 5)
+
+
+def to_rows(pic, invert, threshold, dither=None):
+    """ Convert to MONO_HLSB rows, dark pixels are 1
+    dither: None (threshold), 'bayer' (ordered 4x4) or 'fs' (Floyd-Steinberg)
+    Return (list): bytes of every row """
+    stride = (pic.width + 7) // 8
+    rows = []
+    error = [0] * (pic.width + 2)  # Floyd-Steinberg errors of the next row, shifted by 1
+    for y in range(pic.height):
+        row = bytearray(stride)
+        levels = [255 - v if invert else v for v in pic.row(y)]
+        if dither == 'fs':
+            current, error = error, [0] * (pic.width + 2)
+            for x in range(pic.width):
+                level = levels[x] + current[x + 1]
+                dark = level < threshold
+                err = level - (0 if dark else 255)
+                current[x + 2] += err * 7 // 16
+                error[x] += err * 3 // 16
+                error[x + 1] += err * 5 // 16
+                error[x + 2] += err // 16
+                levels[x] = 0 if dark else 255
+        for x, level in enumerate(levels):
+            if dither == 'bayer':
+                dark = level * 16 < BAYER4[(y & 3) * 4 + (x & 3)] * 255 + 128
+            else:
+                dark = level < threshold
+            if dark:
+                row[x >> 3] |= 0x80 >> (x & 7)
+        rows.append(bytes(row))
+    return rows
+
+
+def write_raw(path, width, height, rows):
+    with open(path, 'wb') as f:
+        f.write(RAW_MAGIC + struct.pack('<HH', width, height))
+        for row in rows:
+            f.write(row)
+
+
+def pack_bits(data):
+    """ PackBits compression, see the compressed image format above """
+    out = bytearray()
+    literal = bytearray()
+    i = 0
+    while i < len(data):
+        run = 1
+        while i + run < len(data) and data[i + run] == data[i] and run < 129:
+            run += 1
+        # A run of 2 only pays off when it does not split a literal
+        if run >= 3 or (run == 2 and not literal):
+            if literal:
+                out.append(len(literal) - 1)
+                out += literal
+                literal = bytearray()
+            out.append(run + 126)
+            out.append(data[i])
+            i += run
+        else:
+            literal.append(data[i])
+            i += 1
+            if len(literal) == 128:
+                out.append(127)
+                out += literal
+                literal = bytearray()
+    if literal:
+        out.append(len(literal) - 1)
+        out += literal
+    return bytes(out)
+
+
+def write_rle(path, width, height, rows):
+    with open(path, 'wb') as f:
+        f.write(RLE_MAGIC + struct.pack('<HH', width, height))
+        f.write(pack_bits(b''.join(rows)))
+
+
+# PARSE COMMAND LINE ARGUMENTS
+
+def quit(msg):
+    print(msg)
+    sys.exit(1)
+
+DESC = """img_to_lcd.py
+Utility to convert BMP, PBM/PGM, PNG... images to the raw LCD240128 format.
+Sample usage:
+img_to_lcd.py splash.png splash.raw
+img_to_lcd.py -c splash.png splash.rle
+img_to_lcd.py -d fs photo.jpg photo.raw
+
+Pixels darker than the threshold are set. Load on device with:
+lcd.load_raw("splash.raw", x, y)
+lcd.load_rle("splash.rle", x, y)
+"""
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(__file__, description=DESC,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('infile', type=str, help='Input image path')
+    parser.add_argument('outfile', type=str, help='Output file path')
+
+    parser.add_argument('-i', '--invert', action='store_true',
+                        help='Set light pixels instead of dark ones')
+    parser.add_argument('-t', '--threshold', type=int, default=128,
+                        help='Gray level 0..255 below which a pixel is dark, default %(default)i')
+    parser.add_argument('-d', '--dither', choices=('bayer', 'fs'),
+                        help='Dither grayscale images: ordered (bayer) or Floyd-Steinberg (fs)')
+    parser.add_argument('-c', '--compress', action='store_true',
+                        help='Write the compressed format for load_rle()')
+
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.infile):
+        quit("Image file does not exist")
+
+    pic = read_image(args.infile)
+    rows = to_rows(pic, args.invert, args.threshold, args.dither)
+    if args.compress:
+        write_rle(args.outfile, pic.width, pic.height, rows)
+    else:
+        write_raw(args.outfile, pic.width, pic.height, rows)
+
+    print(args.outfile, 'written successfully.')
@@ -0,0 +1,178 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Runs the LCD240128 driver under CPython to pre-render screens offline:
+# the same drawing code ( FrameBuffer primitives, draw_text, draw_bitmap,
+# load_bmp... ) writes the same framebuffer bytes as on the device, and the
+# screens are saved as raw or compressed images for load_raw() / load_rle().
+# Needs NumPy for the framebuf stand-in: pip install numpy
+#
+# In a script:
+#   from lcd_host import HostLCD
+#   lcd = HostLCD()
+#   lcd.draw_text("Hello", 0, 0)
+#   lcd.save("hello.rle")
+
+import argparse
+import builtins
+import importlib.util
+import os
+import sys
+import time
+import types
+
+import framebuf_host
+from img_to_lcd import write_raw, write_rle
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# MICROPYTHON ENVIRONMENT
+
+class _Ptr:
+    """ Viper pointer: ptr8, ptr16 and ptr32 ( signed like viper ints ) """
+    def __init__(self, buffer, code):
+        self._mem = memoryview(buffer).cast('B').cast(code)
+        self._mask = (1 << (self._mem.itemsize * 8)) - 1
+        self._signed = code == 'i'
+
+    def __getitem__(self, i):
+        return self._mem[i]
+
+    def __setitem__(self, i, value):
+        value &= self._mask
+        if self._signed and value > 0x7FFFFFFF:
+            value -= 0x100000000
+        self._mem[i] = value
+
+
+class _Pin:
+    OUT = 1
+    IN = 0
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def init(self, *args, **kwargs):
+        pass
+
+    def value(self, value=None):
+        return 1 # data bus always ready
+
+
+def _install():
+    """ Modules and builtins of MicroPython the driver uses """
+    micropython = types.ModuleType('micropython')
+    micropython.viper = micropython.native = lambda f: f
+    micropython.const = lambda value: value
+    machine = types.ModuleType('machine')
+    machine.Pin = _Pin
+    sys.modules.setdefault('micropython', micropython)
+    sys.modules.setdefault('machine', machine)
+    sys.modules['framebuf'] = framebuf_host
+
+    builtins.micropython = sys.modules['micropython']
+    builtins.const = lambda value: value
+    builtins.ptr8 = lambda buffer: _Ptr(buffer, 'B')
+    builtins.ptr16 = lambda buffer: _Ptr(buffer, 'H')
+    builtins.ptr32 = lambda buffer: _Ptr(buffer, 'i')
+
+    for name, func in (('sleep_us', lambda us: None), ('sleep_ms', lambda ms: None),
+                       ('ticks_ms', lambda: int(time.monotonic() * 1000)),
+                       ('ticks_us', lambda: int(time.monotonic() * 1000000)),
+                       ('ticks_diff', lambda a, b: a - b), ('ticks_add', lambda a, b: a + b)):
+        if not hasattr(time, name):
+            setattr(time, name, func)
+    time.ticks_cpu = getattr(time, 'ticks_cpu', time.ticks_us)
+
+    if ROOT not in sys.path:
+        sys.path.append(ROOT)
+
+
+_install()
+import lcd240128  # noqa: E402
+
+
+class HostLCD(lcd240128.LCD240128):
+    """ Driver without a display: drawing only, show() sends nothing """
+    def __init__(self, rotation=0):
+        super().__init__(0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, rotation=rotation)
+
+    def reset(self):
+        pass
+
+    def _init(self):
+        pass
+
+    def set_command(self, cmd, data1=None, data2=None):
+        pass
+
+    def _send(self, start, count):
+        pass
+
+    def rows(self):
+        """ Framebuffer as MONO_HLSB rows, the layout of raw images
+        Return (list): bytes of every row """
+        data = bytes(self.buffer)
+        if self._rotation == 1:
+            data = data.translate(lcd240128._REV8)
+        stride = lcd240128.LCD_COLUMNS
+        return [data[i:i + stride] for i in range(0, len(data), stride)]
+
+    def save(self, filename):
+        """ Save the screen: .rle compressed for load_rle(), else raw for load_raw() """
+        if os.path.splitext(filename)[1].upper() == '.RLE':
+            write_rle(filename, self.width, self.height, self.rows())
+        else:
+            write_raw(filename, self.width, self.height, self.rows())
+
+
+# PARSE COMMAND LINE ARGUMENTS
+
+def quit(msg):
+    print(msg)
+    sys.exit(1)
+
+DESC = """lcd_host.py
+Utility to pre-render screens with the driver under CPython.
+Sample usage:
+lcd_host.py screens.py out/
+lcd_host.py -c screens.py out/
+
+Every function screen_NAME( lcd ) of the script draws one screen, which is
+saved as out/NAME.raw ( or out/NAME.rle with -c ). The screen is cleared
+before each function.
+"""
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(__file__, description=DESC,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('script', type=str, help='Python script with screen_ functions')
+    parser.add_argument('outdir', type=str, help='Output folder')
+    parser.add_argument('-c', '--compress', action='store_true',
+                        help='Save compressed images for load_rle()')
+    parser.add_argument('-r', '--rotation', type=int, default=0, choices=(0, 1),
+                        help='Display rotation, default %(default)i')
+
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.script):
+        quit('Script file does not exist')
+    os.makedirs(args.outdir, exist_ok=True)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    spec = importlib.util.spec_from_file_location('screens', args.script)
+    screens = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(screens)
+
+    lcd = HostLCD(args.rotation)
+    ext = '.rle' if args.compress else '.raw'
+    count = 0
+    start = time.monotonic()
+    for name, func in sorted(vars(screens).items()):
+        if name.startswith('screen_') and callable(func):
+            lcd.fill(0)
+            func(lcd)
+            lcd.save(os.path.join(args.outdir, name[len('screen_'):] + ext))
+            count += 1
+
+    print(count, 'screens written to', args.outdir, 'in {:.3f} s.'.format(time.monotonic() - start))
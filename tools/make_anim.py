@@ -0,0 +1,143 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+# Packs a sequence of frames into a delta-encoded animation for
+# lcd.play_anim(): every frame only stores the framebuffer bytes that
+# changed since the previous one
+# Frames are images (BMP, PBM/PGM, PNG... see img_to_lcd.py), placed at x, y
+# on a cleared 240x128 screen
+
+# Animation format
+# ==============================
+# 0  2 bytes  b'A1'
+# 2  2 bytes  frame count, little endian
+# 4  2 bytes  frame period in ms
+# 6  1 byte   mode: 0 = spans replace framebuffer bytes, 1 = spans are XORed
+# 7  1 byte   reserved
+# 8  frames: frame 0 (from a cleared screen), frames 1..count-1, then the
+#    frame going from the last frame back to frame 0 for looping
+#
+# Frame: span count (2 bytes), then every span:
+#   2 bytes  address: framebuffer byte, row * 30 + column
+#   2 bytes  length
+#   length bytes of MONO_HLSB data: new bytes or old ^ new in XOR mode
+
+import argparse
+import os
+import struct
+import sys
+
+from img_to_lcd import read_image, to_rows
+
+ANIM_MAGIC = b'A1'
+LCD_WIDTH = 240
+LCD_HEIGHT = 128
+LCD_COLUMNS = LCD_WIDTH // 8
+
+
+def render_frame(path, x, y, invert, threshold):
+    """ Image placed on a cleared screen
+    Return (bytes): Framebuffer, MONO_HLSB """
+    pic = read_image(path)
+    stride = (pic.width + 7) // 8
+    screen = bytearray(LCD_WIDTH * LCD_HEIGHT // 8)
+    for row, data in enumerate(to_rows(pic, invert, threshold)):
+        ypos = y + row
+        if not 0 <= ypos < LCD_HEIGHT:
+            continue
+        for col in range(pic.width):
+            xpos = x + col
+            if 0 <= xpos < LCD_WIDTH and data[col >> 3] & (0x80 >> (col & 7)):
+                screen[ypos * LCD_COLUMNS + (xpos >> 3)] |= 0x80 >> (xpos & 7)
+    return bytes(screen)
+
+
+def diff_spans(old, new, gap):
+    """ Changed byte ranges, ranges closer than gap bytes are merged
+    (a new span costs an address command on the bus)
+    Return (list): ( start, end ) of every span """
+    spans = []
+    for i in range(len(new)):
+        if old[i] != new[i]:
+            if spans and i - spans[-1][1] <= gap:
+                spans[-1][1] = i + 1
+            else:
+                spans.append([i, i + 1])
+    return spans
+
+
+def encode_frame(old, new, gap, xor):
+    spans = diff_spans(old, new, gap)
+    out = bytearray(struct.pack('<H', len(spans)))
+    for start, end in spans:
+        out += struct.pack('<HH', start, end - start)
+        if xor:
+            out += bytes(a ^ b for a, b in zip(old[start:end], new[start:end]))
+        else:
+            out += new[start:end]
+    return bytes(out)
+
+
+def write_anim(path, frames, period, gap, xor):
+    blank = bytes(len(frames[0]))
+    with open(path, 'wb') as f:
+        f.write(ANIM_MAGIC + struct.pack('<HHBB', len(frames), period, int(xor), 0))
+        size = 0
+        for old, new in zip([blank] + frames[:-1], frames):
+            data = encode_frame(old, new, gap, xor)
+            size += len(data)
+            f.write(data)
+        f.write(encode_frame(frames[-1], frames[0], gap, xor))
+    return size
+
+
+# PARSE COMMAND LINE ARGUMENTS
+
+def quit(msg):
+    print(msg)
+    sys.exit(1)
+
+DESC = """make_anim.py
+Utility to pack a sequence of frames into a delta-encoded animation.
+Sample usage:
+make_anim.py frames_folder/ boot.anim
+make_anim.py -f 25 -x 100 -y 40 f1.bmp f2.bmp f3.bmp status.anim
+
+Frames of a folder are taken in file name order. Play on device with:
+lcd.play_anim("boot.anim", loops)
+"""
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(__file__, description=DESC,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('infiles', type=str, nargs='+', help='Folder of frames or frame images')
+    parser.add_argument('outfile', type=str, help='Output animation file')
+
+    parser.add_argument('-f', '--fps', type=int, default=10,
+                        help='Target frame rate, default %(default)i')
+    parser.add_argument('-x', type=int, default=0, help='X position of frames on screen')
+    parser.add_argument('-y', type=int, default=0, help='Y position of frames on screen')
+    parser.add_argument('--xor', action='store_true',
+                        help='XOR spans: play over any screen content')
+    parser.add_argument('-g', '--gap', type=int, default=6,
+                        help='Merge spans closer than this many bytes, default %(default)i')
+    parser.add_argument('-i', '--invert', action='store_true',
+                        help='Set light pixels instead of dark ones')
+    parser.add_argument('-t', '--threshold', type=int, default=128,
+                        help='Gray level 0..255 below which a pixel is dark, default %(default)i')
+
+    args = parser.parse_args()
+
+    paths = args.infiles
+    if len(paths) == 1 and os.path.isdir(paths[0]):
+        paths = [os.path.join(paths[0], name) for name in sorted(os.listdir(paths[0]))]
+    for path in paths:
+        if not os.path.isfile(path):
+            quit('Frame file does not exist: {}'.format(path))
+    if args.fps <= 0:
+        quit('Frame rate must be positive')
+
+    frames = [render_frame(p, args.x, args.y, args.invert, args.threshold) for p in paths]
+    size = write_anim(args.outfile, frames, 1000 // args.fps, args.gap, args.xor)
+
+    print(args.outfile, 'written successfully:', len(frames), 'frames,', size,
+          'bytes instead of', len(frames) * len(frames[0]), 'for full frames.')
@@ -0,0 +1,359 @@
+"""
+Retained-mode widgets for the LCD240128 drivers ( lcd240128.py and lcd240128_rp2.py )
+
+Every widget owns a rectangle and a value. Setting a value that changes what
+the widget shows marks it dirty; Screen.update() draws only the dirty
+widgets, each clearing its own background, and sends their rectangles
+with show_dirty().
+
+Example:
+    screen = Screen( lcd )
+    temp = screen.add( Value( 0, 0, 120, 24, LibreBodoni20, "{:.1f} C" ) )
+    level = screen.add( Bar( 0, 30, 120, 10, 0, 100 ) )
+    while True:
+        temp.set( read_temp() )
+        level.set( read_level() )
+        screen.update()
+"""
+from array import array
+
+class Widget:
+    """ Base widget: a rectangle and a value
+    Args
+    x (int): Start X position
+    y (int): Start Y position
+    w (int): Width
+    h (int): Height
+    value : Initial value
+    color (int): Foreground color 0 or 1, the background is the other one
+    """
+    def __init__( self, x, y, w, h, value = None, color = 1 ):
+        self.x = x
+        self.y = y
+        self.w = w
+        self.h = h
+        self.value = value
+        self.color = color
+        self.dirty = True
+
+    def set( self, value ):
+        """ Set the value, the widget is drawn again only if it changes """
+        if value != self.value:
+            self.value = value
+            self.dirty = True
+
+    def invalidate( self ):
+        self.dirty = True
+
+    def render( self, lcd ):
+        """ Draw the widget, its background is already cleared """
+        pass
+
+    def draw( self, lcd ):
+        """ Clear the background and draw the widget inside its rectangle """
+        lcd.fill_rect( self.x, self.y, self.w, self.h, self.color ^ 1 )
+        lcd.push_clip( self.x, self.y, self.w, self.h )
+        self.render( lcd )
+        lcd.pop_clip()
+        self.dirty = False
+
+    def update( self, lcd ):
+        """ Draw the widget if it is dirty
+        Return (tuple): Changed area ( x, y, w, h ), None if nothing changed
+        """
+        if not self.dirty:
+            return None
+        self.draw( lcd )
+        return ( self.x, self.y, self.w, self.h )
+
+class Label( Widget ):
+    """ Text, the value is the string shown
+    Args
+    x, y, w, h (int): Rectangle
+    text (string): Text
+    font (module): Font made by font_to_py.py, None: 8x8 font of FrameBuffer
+    color (int): Color 0 or 1
+    """
+    def __init__( self, x, y, w, h, text = "", font = None, color = 1 ):
+        super().__init__( x, y, w, h, text, color )
+        self.font = font
+
+    def text( self ):
+        return str( self.value )
+
+    def render( self, lcd ):
+        if self.font is None:
+            # FrameBuffer.text ignores the clip: cut the text to the width
+            lcd.text( self.text()[:self.w // 8], self.x, self.y, self.color )
+        else:
+            # The font of the display is restored: drawing has no side effect
+            font = lcd._font
+            lcd.set_font( self.font )
+            lcd.draw_text( self.text(), self.x, self.y, self.color )
+            lcd.set_font( font )
+
+class Value( Label ):
+    """ Formatted number
+    Args
+    x, y, w, h (int): Rectangle
+    font (module): Font made by font_to_py.py, None: 8x8 font of FrameBuffer
+    fmt (string): Format, example: "{:.1f} C"
+    value : Initial value
+    color (int): Color 0 or 1
+    """
+    def __init__( self, x, y, w, h, font = None, fmt = "{}", value = 0, color = 1 ):
+        super().__init__( x, y, w, h, value, font, color )
+        self.fmt = fmt
+        self._shown = fmt.format( value )
+
+    def set( self, value ):
+        # Only a change of the formatted text is a change
+        text = self.fmt.format( value )
+        self.value = value
+        if text != self._shown:
+            self._shown = text
+            self.dirty = True
+
+    def text( self ):
+        return self.fmt.format( self.value )
+
+class Bar( Widget ):
+    """ Horizontal bar graph in a frame
+    Args
+    x, y, w, h (int): Rectangle
+    low (number): Value of an empty bar
+    high (number): Value of a full bar
+    value : Initial value
+    color (int): Color 0 or 1
+    """
+    def __init__( self, x, y, w, h, low = 0, high = 100, value = 0, color = 1 ):
+        super().__init__( x, y, w, h, value, color )
+        self.low = low
+        self.high = high
+        self._fill = self._width( value )
+
+    def _width( self, value ):
+        value = min( max( value, self.low ), self.high )
+        return int( ( value - self.low ) * ( self.w - 4 ) / ( self.high - self.low ) )
+
+    def set( self, value ):
+        # Only a change of the bar length is a change
+        self.value = value
+        fill = self._width( value )
+        if fill != self._fill:
+            self._fill = fill
+            self.dirty = True
+
+    def render( self, lcd ):
+        lcd.rect( self.x, self.y, self.w, self.h, self.color )
+        lcd.fill_rect( self.x + 2, self.y + 2, self._width( self.value ), self.h - 4, self.color )
+
+class Frame( Widget ):
+    """ Rectangle border with an optional title in the 8x8 font
+    Args
+    x, y, w, h (int): Rectangle
+    title (string): Title on the top border
+    color (int): Color 0 or 1
+    """
+    def __init__( self, x, y, w, h, title = "", color = 1 ):
+        super().__init__( x, y, w, h, title, color )
+        self._drawn = None # top border row and title box width last drawn
+
+    def draw( self, lcd ):
+        # Only the border belongs to a frame: widgets inside are not cleared,
+        # only what the last draw put on the top border is erased
+        if self._drawn:
+            last, width = self._drawn
+            bg = self.color ^ 1
+            lcd.hline( self.x, last, self.w, bg )
+            lcd.vline( self.x, self.y, 5, bg )
+            lcd.vline( self.x + self.w - 1, self.y, 5, bg )
+            if width:
+                lcd.fill_rect( self.x + 6, self.y, width, 8, bg )
+        top = self.y + 4 if self.value else self.y
+        lcd.rect( self.x, top, self.w, self.y + self.h - top, self.color )
+        title = self.value[:max( self.w - 16, 0 ) // 8] # inside the top border
+        width = len( title ) * 8 + 4 if title else 0
+        if title:
+            lcd.fill_rect( self.x + 6, self.y, width, 8, self.color ^ 1 )
+            lcd.text( title, self.x + 8, self.y, self.color )
+        self._drawn = ( top, width )
+        self.dirty = False
+
+class StripChart( Widget ):
+    """ Scrolling plot of one or more traces, newest samples on the right
+    Samples go to a ring buffer of one min / max pair per pixel column. A new
+    column shifts the plot left by one pixel and only the new segment is
+    drawn; the whole plot is drawn again only when the scale changes.
+    Args
+    x, y, w, h (int): Rectangle
+    traces (int): Number of traces
+    low (number): Value at the bottom, None: autoscale
+    high (number): Value at the top, None: autoscale
+    per_column (int): Samples per pixel column, their min and max are drawn
+    color (int): Color 0 or 1
+    """
+    def __init__( self, x, y, w, h, traces = 1, low = None, high = None, per_column = 1, color = 1 ):
+        super().__init__( x, y, w, h, None, color )
+        self.traces = traces
+        self.per_column = per_column
+        self.autoscale = low is None or high is None
+        self.low = 0 if low is None else low
+        self.high = 1 if high is None else high
+        
+        self._mins = [array( 'f', bytes( 4 * w ) ) for _ in range( traces )]
+        self._maxs = [array( 'f', bytes( 4 * w ) ) for _ in range( traces )]
+        self._head = 0    # ring position of the next column
+        self._columns = 0 # columns in the ring
+        self._new = 0     # columns not drawn yet
+        self._acc = None  # min / max of the samples of the current column
+        self._samples = 0
+        self._data_low = None # extremes of the samples in the ring
+        self._data_high = None
+        
+    def append( self, *samples ):
+        """ Add one sample per trace """
+        acc = self._acc
+        if acc is None:
+            self._acc = [[v, v] for v in samples]
+        else:
+            for i in range( self.traces ):
+                v = samples[i]
+                if v < acc[i][0]:
+                    acc[i][0] = v
+                if v > acc[i][1]:
+                    acc[i][1] = v
+        self._samples += 1
+        if self._samples == self.per_column:
+            self._push( self._acc )
+            self._acc = None
+            self._samples = 0
+            
+    def _push( self, column ):
+        """ Store a finished column in the ring and keep the scale up to date """
+        head = self._head
+        rescan = False
+        if self._columns == self.w:
+            # The oldest column leaves: were its values the extremes?
+            for i in range( self.traces ):
+                if self._mins[i][head] <= self._data_low or self._maxs[i][head] >= self._data_high:
+                    rescan = True
+        else:
+            self._columns += 1
+            
+        for i in range( self.traces ):
+            low, high = column[i]
+            self._mins[i][head] = low
+            self._maxs[i][head] = high
+            if self._data_low is None or low < self._data_low:
+                self._data_low = low
+            if self._data_high is None or high > self._data_high:
+                self._data_high = high
+        self._head = ( head + 1 ) % self.w
+        self._new += 1
+        
+        if rescan:
+            self._scan()
+        if self.autoscale:
+            self._rescale()
+            
+    def _scan( self ):
+        """ Extremes of the samples in the ring, only when an extreme left it """
+        low = high = None
+        for i in range( self.traces ):
+            for j in range( self._columns ):
+                pos = ( self._head - 1 - j ) % self.w
+                if low is None or self._mins[i][pos] < low:
+                    low = self._mins[i][pos]
+                if high is None or self._maxs[i][pos] > high:
+                    high = self._maxs[i][pos]
+        self._data_low = low
+        self._data_high = high
+        
+    def _rescale( self ):
+        """ Grow the scale to fit the samples, shrink it when they use less than half of it """
+        low, high = self._data_low, self._data_high
+        span = self.high - self.low
+        if low >= self.low and high <= self.high and ( high - low ) * 2 >= span:
+            return
+        margin = ( high - low ) / 10 or 1
+        self.low = low - margin
+        self.high = high + margin
+        self.dirty = True
+        
+    def _y( self, value ):
+        """ Screen row of a value """
+        row = int( ( value - self.low ) * ( self.h - 1 ) / ( self.high - self.low ) )
+        return self.y + self.h - 1 - min( max( row, 0 ), self.h - 1 )
+        
+    def _draw_column( self, lcd, col, pos ):
+        """ Draw the column at ring position pos at screen column col, joined to the previous one """
+        prev = ( pos - 1 ) % self.w
+        first = pos == ( self._head - self._columns ) % self.w # oldest column
+        for i in range( self.traces ):
+            low, high = self._mins[i][pos], self._maxs[i][pos]
+            if not first:
+                # Join: extend the span to the previous column
+                low = min( low, self._maxs[i][prev] )
+                high = max( high, self._mins[i][prev] )
+            top = self._y( high )
+            lcd.vline( col, top, self._y( low ) - top + 1, self.color )
+            
+    def render( self, lcd ):
+        right = self.x + self.w - 1
+        for j in range( self._columns ):
+            pos = ( self._head - 1 - j ) % self.w
+            self._draw_column( lcd, right - j, pos )
+        self._new = 0
+        
+    def update( self, lcd ):
+        if self.dirty:
+            return super().update( lcd )
+        new = min( self._new, self.w )
+        if not new:
+            return None
+        
+        # Shift the plot left, uncovering the new columns, and draw them
+        lcd.scroll_region( self.x, self.y, self.w, self.h, -new, 0, self.color ^ 1 )
+        right = self.x + self.w - 1
+        for j in range( new ):
+            self._draw_column( lcd, right - j, ( self._head - 1 - j ) % self.w )
+        self._new = 0
+        return ( self.x, self.y, self.w, self.h )
+
+class Screen:
+    """ Widgets of one screen
+    Args
+    lcd (LCD240128): Display
+    """
+    def __init__( self, lcd ):
+        self.lcd = lcd
+        self.widgets = []
+
+    def add( self, widget ):
+        """ Add a widget, drawn at the next update
+        Return (Widget): The widget
+        """
+        self.widgets.append( widget )
+        widget.dirty = True
+        return widget
+
+    def invalidate( self ):
+        """ Draw every widget again at the next update """
+        for widget in self.widgets:
+            widget.dirty = True
+
+    def update( self ):
+        """ Draw the dirty widgets and send their rectangles to lcd
+        Return (int): Number of widgets drawn
+        """
+        lcd = self.lcd
+        count = 0
+        for widget in self.widgets:
+            area = widget.update( lcd )
+            if area:
+                lcd.mark_dirty( *area )
+                count += 1
+        if count:
+            lcd.show_dirty()
+        return count